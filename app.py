@@ -1,45 +1,58 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
-from config import CURRENT_YEAR, FINANCIAL_CRISES, GEOPOLITICAL_WARS, COLORS, load_css
-from data_engine import fetch_seasonality_data_v5, fetch_presidential_cycle_data, fetch_global_macro_data, compute_seasonality, compute_cycle_seasonality
-from plot_engine import make_bar_chart, make_cumulative_chart, make_presidential_cycle_chart, make_rebased_macro_chart
-from data_engine import fetch_seasonality_data_v5, fetch_presidential_cycle_data, fetch_global_macro_data, compute_seasonality, compute_cycle_seasonality, fetch_sector_data, compute_rrg
-from plot_engine import make_bar_chart, make_cumulative_chart, make_presidential_cycle_chart, make_rebased_macro_chart, make_rrg_chart
+from config import CURRENT_YEAR, FINANCIAL_CRISES, GEOPOLITICAL_WARS, COLORS, SCREENER_UNIVERSE, SECTORS, PREFETCH_TICKERS, TIMEFRAMES, DAILY_HORIZONS, load_css
+from data_engine import fetch_seasonality_data_v5, fetch_presidential_cycle_data, fetch_global_macro_data, compute_cycle_seasonality, fetch_sector_data, fetch_universe_cube, fetch_macro_closes, rebase_macro, prefetch_daily_closes, shared_compute_seasonality, update_rrg_history, build_csv, cube_pivot, compute_significance, fetch_similarity_index
+from plot_engine import make_bar_chart, make_cumulative_chart, make_presidential_cycle_chart, make_rebased_macro_chart, make_rrg_chart, make_backtest_chart, make_event_overlay_chart, make_similarity_chart
+from screener_engine import screen
+from backtest_engine import backtest
+from event_engine import event_study, event_paths, parse_events
+from similarity_engine import METRICS, cycle_query
+from cycle_engine import CYCLES
+from rrg_engine import rrg_tail
+from memo_cache import get_memo_cache
+from figure_codec import compact_figure, SerializedFigure
+from shared_cache import get_shared_cache
+import telemetry
 
 st.set_page_config(page_title="ETF Seasonality Dashboard", page_icon="📈", layout="wide", initial_sidebar_state="expanded")
 st.markdown(load_css(), unsafe_allow_html=True)
+memo = get_memo_cache()
+telemetry.begin_run(st.session_state.get("diagnostics", telemetry.DEFAULT_ENABLED))
 
-def build_csv(data: dict, timeframe: str) -> bytes:
-    periods, label, rows = data["periods"], "Week" if timeframe == "Weekly" else "Month", []
-    for p in periods:
-        rows.append({label: p, "Avg_5yr_%": round(data["avg_5"].get(p, np.nan), 4), "Avg_10yr_%": round(data["avg_10"].get(p, np.nan), 4), "Avg_Max_%": round(data["avg_max"].get(p, np.nan), 4), "WinRate_5yr": round(data["wr_5"].get(p, np.nan), 1), "WinRate_10yr": round(data["wr_10"].get(p, np.nan), 1), "WinRate_Max": round(data["wr_max"].get(p, np.nan), 1), f"{CURRENT_YEAR}_Actual_%": round(data["cur_roc"].get(p, np.nan), 4)})
-    buf = io.BytesIO()
-    pd.DataFrame(rows).to_csv(buf, index=False)
-    return buf.getvalue()
+def show_chart(name: str, fig, **kwargs):
+    # Downsampled, precision-trimmed, typed-array encoded and serialized once per set of figure inputs
+    spec = memo.call(compact_figure, fig)
+    telemetry.record_figure(name, spec)
+    with telemetry.span("render", name):
+        st.plotly_chart(SerializedFigure(spec), use_container_width=True, **kwargs)
 
 with st.sidebar:
     st.markdown('<div class="section-header">Configuration</div>', unsafe_allow_html=True)
     ticker = st.text_input("Ticker Symbol", value="QQQ").upper().strip()
     start_year = st.number_input("Start Year", min_value=1950, max_value=CURRENT_YEAR - 1, value=2010)
-    timeframe = st.radio("Timeframe", ["Weekly", "Monthly"], horizontal=True)
+    timeframe = st.radio("Timeframe", list(TIMEFRAMES), horizontal=True)
+    horizon = st.select_slider("Forward Horizon (trading days)", options=DAILY_HORIZONS, value=1) if timeframe == "Daily" else 1
     show_winrate = st.checkbox("Show Win Rate %", value=True)
     show_spaghetti = st.checkbox("Show All Past Years", value=True)
+    show_significance = st.checkbox("Significance (Bootstrap CI & p-values)", value=False)
+    st.checkbox("Diagnostics", value=telemetry.DEFAULT_ENABLED, key="diagnostics")
 
 col1, col2 = st.columns([3, 1])
 with col1:
     st.markdown('<div class="main-title">📈 ETF Seasonality Dashboard</div>', unsafe_allow_html=True)
-    st.markdown(f'<div class="sub-title">{ticker} · {timeframe} · Since {start_year}</div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="sub-title">{ticker} · {timeframe}{f" · {horizon}D Forward" if horizon > 1 else ""} · Since {start_year}</div>', unsafe_allow_html=True)
 
 with st.spinner(f"Loading {ticker} data…"):
-    roc_df = fetch_seasonality_data_v5(ticker, start_year, timeframe)
+    roc_df = fetch_seasonality_data_v5(ticker, start_year, timeframe, horizon)
 
 if roc_df is None or roc_df.empty:
     st.error(f"❌ Could not retrieve data for {ticker}.")
     st.stop()
 
-data = compute_seasonality(roc_df, timeframe, start_year)
+# The shared cube holds 1-period returns only
+data = memo.call(shared_compute_seasonality, roc_df, timeframe, start_year, cube_pivot(ticker, timeframe, start_year) if horizon == 1 else None, horizon)
+sig = memo.call(compute_significance, data) if show_significance else None
 cur_p = data["current_period"]
 am, wm, ac = data["avg_max"].get(cur_p, np.nan), data["wr_max"].get(cur_p, np.nan), data["cur_roc"].get(cur_p, np.nan)
 
@@ -50,30 +63,61 @@ m3.markdown(f'<div class="metric-card"><div class="metric-label">{CURRENT_YEAR}
 m4.markdown(f'<div class="metric-card"><div class="metric-label">Dataset Years</div><div class="metric-value">{len(data["completed_years"])}</div></div>', unsafe_allow_html=True)
 
 st.markdown("<br>", unsafe_allow_html=True)
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Average Returns", "〰️ Cumulative Trend", "🇺🇸 Presidential Cycle", "🌍 Macro Events", "🔄 Sector Rotation"])
+# Only the open tab's body runs on a rerun; switching tabs reruns the script with the new tab open
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["📊 Average Returns", "〰️ Cumulative Trend", "🇺🇸 Presidential Cycle", "🌍 Macro Events", "🔄 Sector Rotation", "🔎 Screener", "🧭 Similarity"], key="active_tab", on_change="rerun")
 
 with tab1:
-    for wk, lbl in [("5", "Last 5 Years"), ("10", "Last 10 Years"), ("max", "Max")]: st.plotly_chart(make_bar_chart(data, wk, show_winrate, timeframe, lbl), use_container_width=True)
+    if tab1.open:
+        if sig is not None: st.caption(f"Error bars: {sig['confidence']:.0%} bootstrap CI of the average ({sig['n_resamples']:,} resamples). Faded bars are not significant at p < {1 - sig['confidence']:.2f} under a sign-flip test; * marks significant win rates.")
+        for wk, lbl in [("5", "Last 5 Years"), ("10", "Last 10 Years"), ("max", "Max")]: show_chart(f"bar_{wk}", memo.call(make_bar_chart, data, wk, show_winrate, timeframe, lbl, sig))
 
 with tab2:
-    for wk, lbl in [("5", "Last 5 Years"), ("10", "Last 10 Years"), ("max", "Max")]: st.plotly_chart(make_cumulative_chart(data, wk, show_spaghetti, timeframe, lbl), use_container_width=True)
+    if tab2.open:
+        path_data = data
+        if horizon > 1:
+            # Overlapping multi-day windows don't compound into a path, so the trend is built from 1-day returns
+            st.caption("Cumulative paths compound 1-day returns; the forward horizon applies to the Average Returns tab.")
+            path_data = memo.call(shared_compute_seasonality, fetch_seasonality_data_v5(ticker, start_year, timeframe), timeframe, start_year, cube_pivot(ticker, timeframe, start_year))
+        for wk, lbl in [("5", "Last 5 Years"), ("10", "Last 10 Years"), ("max", "Max")]: show_chart(f"cumulative_{wk}", memo.call(make_cumulative_chart, path_data, wk, show_spaghetti, timeframe, lbl))
 
 with tab3:
-    spx_df = fetch_presidential_cycle_data()
-    if spx_df is not None: st.plotly_chart(make_presidential_cycle_chart(compute_cycle_seasonality(spx_df)), use_container_width=True)
+    if tab3.open:
+        spx_df = fetch_presidential_cycle_data()
+        if spx_df is not None: show_chart("presidential_cycle", memo.call(make_presidential_cycle_chart, memo.call(compute_cycle_seasonality, spx_df)))
 
 with tab4:
-    global_data = fetch_global_macro_data()
-    if global_data:
-        cols = st.columns(4)
-        selected_assets = [name for i, name in enumerate(global_data.keys()) if cols[i % 4].checkbox(name, value=("US" in name or "Gold" in name or "Crude" in name))]
-        if selected_assets:
-            filtered_data = {k: global_data[k] for k in selected_assets}
-            st.plotly_chart(make_rebased_macro_chart(filtered_data, FINANCIAL_CRISES, COLORS["crisis_zone"], "Financial Crises"), use_container_width=True)
-            st.plotly_chart(make_rebased_macro_chart(filtered_data, GEOPOLITICAL_WARS, COLORS["war_zone"], "Geopolitical Conflicts"), use_container_width=True)
+    if tab4.open:
+        global_data, macro_failures = fetch_global_macro_data()
+        if macro_failures: st.caption(f"⚠️ Unavailable: {', '.join(macro_failures)}")
+        if global_data:
+            cols = st.columns(4)
+            selected_assets = [name for i, name in enumerate(global_data.keys()) if cols[i % 4].checkbox(name, value=("US" in name or "Gold" in name or "Crude" in name))]
+            custom_txt = st.text_area("Custom Events (one per line: Name, start, end — leave end blank if ongoing)", value="", height=68, placeholder="Fed Hiking Cycle, 2022-03-16, 2023-07-26")
+            custom_events, event_errors = parse_events(custom_txt)
+            if event_errors: st.caption(f"⚠️ Skipped: {'; '.join(event_errors)}")
+            if selected_assets:
+                rebased = memo.call(rebase_macro, {k: global_data[k] for k in selected_assets})
+                show_chart("macro_crises", memo.call(make_rebased_macro_chart, rebased, FINANCIAL_CRISES, COLORS["crisis_zone"], "Financial Crises"))
+                show_chart("macro_wars", memo.call(make_rebased_macro_chart, rebased, GEOPOLITICAL_WARS, COLORS["war_zone"], "Geopolitical Conflicts"))
+                if custom_events: show_chart("macro_custom", memo.call(make_rebased_macro_chart, rebased, custom_events, COLORS["custom_zone"], "Custom Events"))
+
+                st.markdown('<div class="section-header">Event Study</div>', unsafe_allow_html=True)
+                e1, e2, e3 = st.columns([2, 1, 1])
+                event_set = e1.radio("Events", ["Financial Crises", "Geopolitical Conflicts", "All"], horizontal=True)
+                events = {"Financial Crises": FINANCIAL_CRISES, "Geopolitical Conflicts": GEOPOLITICAL_WARS, "All": FINANCIAL_CRISES + GEOPOLITICAL_WARS}[event_set] + custom_events
+                overlay_asset = e2.selectbox("Overlay Asset", selected_assets)
+                horizon_days = e3.slider("Days After Start", 30, 1825, 365, step=30)
+                # Daily closes: returns, drawdowns and recovery times resolve to the day, not the month-end
+                macro_closes, _ = fetch_macro_closes()
+                study_closes = {k: macro_closes[k] for k in selected_assets if k in macro_closes}
+                st.dataframe(memo.call(event_study, study_closes, events).round({"Return_%": 2, "Max_DD_%": 2}), use_container_width=True, hide_index=True)
+                st.caption("Max_DD_% is measured from the event-start level; Days_To_Recovery counts from the trough until that level is regained (blank = not yet).")
+                if overlay_asset in study_closes:
+                    show_chart("event_overlay", memo.call(make_event_overlay_chart, memo.call(event_paths, study_closes[overlay_asset], events, horizon_days), f"{overlay_asset}: Aligned Event Paths"))
 
 with tab5:
-    st.markdown("""
+    if tab5.open:
+        st.markdown("""
     <div style="background-color: #12151c; border: 1px solid #1e2330; border-left: 3px solid #39FF14; border-radius: 6px; padding: 1rem; margin-bottom: 1rem; font-size: 0.85rem; color: #8d9ab0; line-height: 1.6;">
     <strong>Relative Sector Rotation Graph (RRG):</strong> Maps the 11 major S&P 500 Select Sector SPDRs against the benchmark (SPY). Follow the "tails" to see how capital is currently rotating through the 4 quadrants (Leading, Weakening, Lagging, Improving).<br><br>
     <strong>Sector Ticker Legend:</strong>
@@ -93,16 +137,109 @@ with tab5:
     </div>
     """, unsafe_allow_html=True)
     
-    with st.spinner("Calculating Sector Rotation matrix..."):
-        sector_df = fetch_sector_data()
-        if sector_df is not None:
-            rrg_data = compute_rrg(sector_df)
-            if rrg_data:
-                st.plotly_chart(make_rrg_chart(rrg_data), use_container_width=True, config={"displayModeBar": False})
+        with st.spinner("Calculating Sector Rotation matrix..."):
+            sector_df = fetch_sector_data(lookback_years=5)
+            if sector_df is not None:
+                rrg_hist = memo.call(update_rrg_history, sector_df, "SPY")
+                rrg_dates = rrg_hist["dates"][np.isfinite(rrg_hist["cube"]).all(axis=(1, 2))]
+                rrg_end = st.select_slider("Tail End Date", options=list(rrg_dates.date), value=rrg_dates[-1].date()) if len(rrg_dates) > 1 else None
+                rrg_data = memo.call(rrg_tail, rrg_hist, 15, rrg_end)
+                if rrg_data:
+                    show_chart("rrg", memo.call(make_rrg_chart, rrg_data), config={"displayModeBar": False})
+                else:
+                    st.error("Failed to compute sector rotation math.")
             else:
-                st.error("Failed to compute sector rotation math.")
+                st.error("Failed to fetch underlying sector ETF data.")
+
+with tab6:
+    if tab6.open:
+        sc1, sc2, sc3 = st.columns([3, 1, 1])
+        universe_txt = sc1.text_area("Universe (comma or newline separated)", value=", ".join(SCREENER_UNIVERSE), height=80)
+        label, n_periods = TIMEFRAMES[timeframe]
+        screen_period = sc2.number_input(label, min_value=1, max_value=n_periods, value=min(cur_p, n_periods))
+        sort_by = sc3.selectbox("Rank By", ["avg_max", "avg_10", "avg_5", "wr_max", "wr_10", "wr_5"])
+        universe = tuple(dict.fromkeys(t.strip().upper() for t in universe_txt.replace("\n", ",").split(",") if t.strip()))
+        with st.spinner(f"Screening {len(universe)} tickers…"):
+            cube_data = fetch_universe_cube(universe, start_year, timeframe, horizon)
+        if cube_data["failures"]: st.caption(f"⚠️ Unavailable: {', '.join(cube_data['failures'])}")
+        st.dataframe(memo.call(screen, cube_data, int(screen_period), sort_by), use_container_width=True, hide_index=True)
+
+        st.markdown('<div class="section-header">Walk-Forward Backtest</div>', unsafe_allow_html=True)
+        b1, b2, b3, b4 = st.columns(4)
+        bt_window = b1.selectbox("Lookback", ["5", "10", "max"], index=1, format_func=lambda w: "Max" if w == "max" else f"{w} Years")
+        bt_min_wr = b2.slider("Min Win Rate %", 50, 90, 60, step=5)
+        bt_edge = b3.number_input("Min Avg Edge %", min_value=0.0, value=0.0, step=0.1)
+        bt_short = b4.checkbox("Allow Shorts", value=True)
+        # Overlapping multi-day windows can't be compounded, so the backtest always trades 1-period returns
+        bt_cube = cube_data if horizon == 1 else fetch_universe_cube(universe, start_year, timeframe)
+        bt = memo.call(backtest, bt_cube, bt_window, float(bt_min_wr), float(bt_edge), bt_short)
+        if bt and bt["stats"]["first_year"]:
+            bs = bt["stats"]
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric("Strategy (EW)", f"{bs['strategy_pct']:+.1f}%", f"{bs['strategy_pct'] - bs['buy_hold_pct']:+.1f}% vs B&H")
+            k2.metric("Hit Rate", f"{bs['hit_rate']:.1f}%" if not pd.isna(bs["hit_rate"]) else "—", f"{bs['trades']:,} trades", delta_color="off")
+            k3.metric("Max Drawdown", f"{bs['max_dd']:.1f}%", f"B&H {bs['buy_hold_dd']:.1f}%", delta_color="off")
+            k4.metric("Out-of-Sample Since", bs["first_year"])
+            show_chart("backtest", memo.call(make_backtest_chart, bt, f"Walk-Forward Seasonal Strategy • {timeframe} signals from prior years only"))
+            st.dataframe(bt["summary"].round(2), use_container_width=True, hide_index=True)
+            with st.expander("By Year"): st.dataframe(bt["yearly"].round(2), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Not enough history for a walk-forward test; lower the start year.")
+
+with tab7:
+    if tab7.open:
+        s1, s2, s3 = st.columns([3, 1, 1])
+        sim_txt = s1.text_area("Universe (comma or newline separated)", value=", ".join(dict.fromkeys(SCREENER_UNIVERSE + list(SECTORS.values()))), height=80, key="sim_universe")
+        profile = s2.selectbox("Profile", ["Seasonal", *CYCLES], help="Seasonal: the calendar-year shape on the sidebar timeframe. Cycles: the multi-year monthly shape, queried with the S&P 500's own cycle path.")
+        metric = s3.selectbox("Metric", METRICS)
+        s4, s5, s6 = st.columns(3)
+        sim_window = s4.selectbox("Lookback", ["max", "10", "5"], format_func=lambda w: "Max" if w == "max" else f"{w} Years") if profile == "Seasonal" else "max"
+        top_k = s5.number_input("Top K", min_value=1, max_value=50, value=10)
+        n_clusters = s6.slider("Clusters", 2, 12, 6)
+        sim_universe = list(dict.fromkeys([ticker] + [t.strip().upper() for t in sim_txt.replace("\n", ",").split(",") if t.strip()]))
+        with st.spinner(f"Indexing {len(sim_universe)} tickers…"):
+            index, sim_failures = fetch_similarity_index(tuple(sim_universe), start_year, timeframe, profile, sim_window)
+        if sim_failures: st.caption(f"⚠️ Unavailable: {', '.join(sim_failures)}")
+
+        if profile == "Seasonal":
+            query_label, query = ticker, index.vectors([ticker]) if ticker in index else None
         else:
-            st.error("Failed to fetch underlying sector ETF data.")
-            
+            spx_df = fetch_presidential_cycle_data()
+            query_label, query = f"S&P 500 {profile} path", cycle_query(memo.call(compute_cycle_seasonality, spx_df, profile)) if spx_df is not None else None
+        if query is None or not len(index):
+            st.caption(f"No {profile.lower()} profile available for {query_label}.")
+        else:
+            neighbours = index.query(query, int(top_k), metric, labels=[query_label], universe=sim_universe)
+            st.dataframe(neighbours.drop(columns="Query").round(3), use_container_width=True, hide_index=True)
+            half = query.shape[1] // 2
+            profiles = {query_label: query[0, :half], **dict(zip(neighbours["Ticker"][:5], index.vectors(list(neighbours["Ticker"][:5]))[:, :half]))}
+            x_title = TIMEFRAMES[timeframe][0] if profile == "Seasonal" else "Months Since Cycle Start"
+            show_chart("similarity", memo.call(make_similarity_chart, profiles, f"{query_label} vs Closest {profile} Profiles ({metric})", x_title))
+
+            clusters = index.cluster(n_clusters, metric, sim_universe)
+            if clusters is None:
+                st.caption("Install SciPy to group the universe into clusters.")
+            else:
+                st.markdown('<div class="section-header">Profile Clusters</div>', unsafe_allow_html=True)
+                st.dataframe(clusters.reset_index().groupby("Cluster")["index"].agg([("Size", "size"), ("Tickers", ", ".join)]).reset_index(), use_container_width=True, hide_index=True)
+
+
+st.download_button("⬇️ Download CSV", memo.call(build_csv, data, timeframe, sig), f"{ticker}_seasonality{f'_{horizon}d' if horizon > 1 else ''}.csv", "text/csv")
+
+# The first chart is on screen by now: warm the local store for the other tabs' datasets in the background
+prefetch_daily_closes(PREFETCH_TICKERS)
 
-st.download_button("⬇️ Download CSV", build_csv(data, timeframe), f"{ticker}_seasonality.csv", "text/csv")
+if telemetry.enabled():
+    cache_stats = {"memo": memo.stats(), "shared": get_shared_cache().stats()}
+    telemetry.log_run(cache_stats)
+    run = telemetry.snapshot()
+    with st.sidebar.expander("⏱️ Diagnostics", expanded=True):
+        st.caption(f"Rerun total: {run['total_ms']:.0f} ms")
+        if run["timings"]:
+            timings = pd.DataFrame(run["timings"]).groupby(["stage", "name"], as_index=False)["ms"].agg(["sum", "count"])
+            st.dataframe(timings.sort_values("sum", ascending=False).round(1), hide_index=True, use_container_width=True)
+        if run["figures"]:
+            st.dataframe(pd.DataFrame(run["figures"]).assign(kb=lambda f: (f["bytes"] / 1024).round(1)).drop(columns="bytes"), hide_index=True, use_container_width=True)
+        st.caption(" · ".join(f"{k}: {v}" for k, v in run["counters"].items()) or "No cache activity")
+        st.caption(f"Memo cache: {cache_stats['memo']['size']}/{cache_stats['memo']['maxsize']} entries, hit rate {cache_stats['memo']['hit_rate']:.0%}")
+        st.download_button("⬇️ Export JSON", telemetry.export_json(cache_stats), "diagnostics.json", "application/json")
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from screener_engine import WINDOWS
+
+def _prefix(a: np.ndarray) -> np.ndarray:
+    # (T, Y+1, ...) running sums over the year axis; index y holds the sum over years < y
+    return np.concatenate([np.zeros(a[:, :1].shape), np.cumsum(a, axis=1)], axis=1)
+
+def prior_window_stats(cube: np.ndarray, n: int | None) -> tuple:
+    # avg / win rate / count for every (ticker, year, period) from the last n years with data strictly before
+    # that year - the same 5 / 10 / max windows as compute_seasonality, but out-of-sample for each year.
+    # Window sums are differences of year-axis prefix sums, so all years are evaluated at once.
+    T, Y, _ = cube.shape
+    valid = ~np.isnan(cube)
+    filled = np.where(valid, cube, 0.0)
+    S, C, W = _prefix(filled), _prefix(valid.astype(float)), _prefix((filled > 0).astype(float))
+    k = _prefix(valid.any(axis=2).astype(int)).astype(int)  # (T, Y+1) data years before each year
+    if n is None:
+        start = np.zeros((T, Y), dtype=int)
+    else:
+        # First prefix index s with k[s] >= k[y] - n, per ticker; offsetting each row by t*(Y+1) keeps the
+        # flattened k sorted so one searchsorted covers every ticker
+        offset = (np.arange(T) * (Y + 1))[:, None]
+        target = np.maximum(k[:, :Y] - n, 0) + offset
+        start = np.searchsorted((k + offset).ravel(), target.ravel(), side="left").reshape(T, Y) - offset
+    take = lambda a: a[:, :Y] - np.take_along_axis(a, start[:, :, None], axis=1)
+    cnt = take(C)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return take(S) / cnt, take(W) / cnt * 100, cnt
+
+def _max_drawdown(equity: np.ndarray) -> np.ndarray:
+    return (equity / np.maximum.accumulate(equity, axis=-1) - 1).min(axis=-1) * 100
+
+def backtest(cube_data: dict, window: str = "10", min_wr: float = 60.0, min_edge: float = 0.0,
+             allow_short: bool = True, min_years: int = 3) -> dict:
+    # Walk-forward seasonal strategy: in each year and period, go long when the prior-years average beats
+    # min_edge with a win rate of at least min_wr, short on the mirror condition, otherwise stay flat.
+    # Positions, returns, equity curves and drawdowns for the whole universe come out of array ops.
+    cube, years, tickers = cube_data["cube"], cube_data["years"], cube_data["tickers"]
+    if cube.size == 0: return {}
+    T, Y, P = cube.shape
+    avg, wr, cnt = prior_window_stats(cube, WINDOWS[window])
+    ok = cnt >= min_years
+    pos = (ok & (avg > min_edge) & (wr >= min_wr)).astype(np.int8)
+    if allow_short: pos -= (ok & (avg < -min_edge) & (wr <= 100 - min_wr)).astype(np.int8)
+
+    valid = ~np.isnan(cube)
+    roc = np.where(valid, cube, 0.0) / 100
+    # Start at the first year any ticker could trade and drop periods nobody has a bar for yet
+    first = np.flatnonzero(ok.any(axis=(0, 2)))
+    y0 = first[0] if len(first) else Y
+    live = valid[:, y0:].reshape(T, -1).any(axis=0)
+    flat = lambda a: a[:, y0:].reshape(T, -1)[:, live]
+    strat, hold, trades, bars = flat(pos * roc), flat(roc), flat((pos != 0) & valid), flat(valid)
+    hits = trades & (strat > 0)
+    timeline = (years[y0:, None] + np.arange(P)[None, :] / P).ravel()[live]
+    year_of = np.repeat(years[y0:], P)[live]
+
+    equity, bh_equity = np.cumprod(1 + strat, axis=1), np.cumprod(1 + hold, axis=1)
+    # Equal weight across the tickers that have a bar in each period
+    n_bars = np.maximum(bars.sum(axis=0), 1)
+    portfolio, portfolio_bh = np.cumprod(1 + strat.sum(axis=0) / n_bars), np.cumprod(1 + hold.sum(axis=0) / n_bars)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary = pd.DataFrame({
+            "Ticker": tickers,
+            "Strategy_%": (equity[:, -1] - 1) * 100 if equity.size else np.nan,
+            "Buy_Hold_%": (bh_equity[:, -1] - 1) * 100 if equity.size else np.nan,
+            "Hit_Rate_%": hits.sum(axis=1) / trades.sum(axis=1) * 100,
+            "Trades": trades.sum(axis=1),
+            "Exposure_%": trades.sum(axis=1) / np.maximum(bars.sum(axis=1), 1) * 100,
+            "Max_DD_%": _max_drawdown(equity) if equity.size else np.nan,
+            "Buy_Hold_DD_%": _max_drawdown(bh_equity) if equity.size else np.nan
+        }).sort_values("Strategy_%", ascending=False, na_position="last").reset_index(drop=True)
+
+        # Timeline is year-ordered, so per-year totals are segment sums starting at each year's first step
+        starts = np.flatnonzero(np.r_[True, year_of[1:] != year_of[:-1]]) if len(year_of) else np.array([], dtype=int)
+        yr_sum = lambda a: np.add.reduceat(a, starts, axis=-1) if len(starts) else a[..., :0]
+        yearly = pd.DataFrame({
+            "Year": year_of[starts],
+            "Strategy_%": (np.exp(yr_sum(np.log1p(strat.sum(axis=0) / n_bars))) - 1) * 100,
+            "Buy_Hold_%": (np.exp(yr_sum(np.log1p(hold.sum(axis=0) / n_bars))) - 1) * 100,
+            "Hit_Rate_%": yr_sum(hits.sum(axis=0)) / yr_sum(trades.sum(axis=0)) * 100,
+            "Trades": yr_sum(trades.sum(axis=0))
+        })
+        n_trades = trades.sum()
+        stats = {
+            "strategy_pct": (portfolio[-1] - 1) * 100 if len(portfolio) else np.nan,
+            "buy_hold_pct": (portfolio_bh[-1] - 1) * 100 if len(portfolio) else np.nan,
+            "hit_rate": hits.sum() / n_trades * 100 if n_trades else np.nan, "trades": int(n_trades),
+            "max_dd": _max_drawdown(portfolio) if len(portfolio) else np.nan,
+            "buy_hold_dd": _max_drawdown(portfolio_bh) if len(portfolio) else np.nan,
+            "first_year": int(years[y0]) if y0 < Y else None
+        }
+    return {
+        "timeline": timeline, "tickers": tickers, "equity": equity, "bh_equity": bh_equity, "portfolio": portfolio,
+        "portfolio_bh": portfolio_bh, "summary": summary, "yearly": yearly, "stats": stats, "positions": pos,
+        "params": {"window": window, "min_wr": min_wr, "min_edge": min_edge, "allow_short": allow_short, "min_years": min_years}
+    }
@@ -0,0 +1,115 @@
+"""Headless batch export of Weekly/Monthly seasonality tables for a ticker universe.
+
+    python batch_export.py --tickers universe.txt --data-dir ./fixtures --out exports/
+    python batch_export.py --tickers universe.txt --combined --format parquet --out exports/all.parquet
+    python batch_export.py --tickers universe.txt --cube          # also write the memory-mapped cubes the app reads
+
+Tickers are read one per line (commas also accepted, '#' starts a comment). Each worker process opens
+the shared local price store, so nothing here needs a Streamlit runtime. Offline runs (--data-dir, or
+SEASONALITY_FIXTURE_DIR) use their provider's own store and need an explicit --cube DIR, so fixture or
+synthetic bars never reach the prices and cubes the dashboard serves.
+
+Exits 1 if any ticker failed (the rest are still exported), so schedulers notice partial runs.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from price_store import PriceStore, store_path
+from providers import FixtureProvider, SyntheticProvider, default_provider
+from data_engine import derive_roc_frame, compute_seasonality, seasonality_table, compute_significance
+from screener_engine import build_return_cube
+from cube_store import write_cube
+from config import CUBE_DIR
+
+_store = None
+# --cube given without a directory
+_DEFAULT_CUBE = object()
+
+def _provider(data_dir: str | None):
+    return (SyntheticProvider() if data_dir == "synthetic" else FixtureProvider(data_dir)) if data_dir else default_provider()
+
+def _init_worker(path: str, data_dir: str | None):
+    global _store
+    _store = PriceStore(path, provider=_provider(data_dir))
+
+def _export(ticker: str, start_year: int, timeframes: tuple, resamples: int = 0) -> tuple:
+    close = _store.load_close(ticker, "1d")
+    if close.empty: raise ValueError(f"No data for {ticker}")
+    tables, rocs = [], {}
+    for tf in timeframes:
+        roc_df = rocs[tf] = derive_roc_frame(close, start_year, tf)
+        data = compute_seasonality(roc_df, tf, start_year)
+        table = seasonality_table(data, tf, compute_significance(data, resamples) if resamples else None)
+        tables.append(table.rename(columns={table.columns[0]: "Period"}).assign(Ticker=ticker, Timeframe=tf))
+    out = pd.concat(tables, ignore_index=True)
+    return out[["Ticker", "Timeframe"] + [c for c in out.columns if c not in ("Ticker", "Timeframe")]], rocs
+
+def export_ticker(ticker: str, start_year: int, timeframes: tuple, resamples: int = 0) -> pd.DataFrame:
+    return _export(ticker, start_year, timeframes, resamples)[0]
+
+def _job(ticker: str, start_year: int, timeframes: tuple, keep_roc: bool, resamples: int) -> tuple:
+    # ROC frames only travel back to the parent when it is assembling cubes
+    out, rocs = _export(ticker, start_year, timeframes, resamples)
+    return out, (rocs if keep_roc else None)
+
+def read_tickers(path: str) -> list:
+    with (sys.stdin if path == "-" else open(path)) as fh:
+        raw = [ln.split("#", 1)[0] for ln in fh]
+    return list(dict.fromkeys(t.strip().upper() for ln in raw for t in ln.split(",") if t.strip()))
+
+def _write(df: pd.DataFrame, path: str, fmt: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fmt == "parquet": df.to_parquet(path, index=False)
+    else: df.to_csv(path, index=False)
+
+def main(argv: list | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--tickers", required=True, help="ticker list file ('-' for stdin)")
+    ap.add_argument("--data-dir", help="directory of <TICKER>_1d.csv fixtures, or 'synthetic' (default: Yahoo)")
+    ap.add_argument("--store", help="price store path (default: DATA_DIR/prices.sqlite, or DATA_DIR/prices-<provider>.sqlite for offline data)")
+    ap.add_argument("--out", default="exports", help="output directory, or file path with --combined")
+    ap.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    ap.add_argument("--combined", action="store_true", help="write one columnar file instead of one per ticker")
+    ap.add_argument("--timeframes", default="Weekly,Monthly")
+    ap.add_argument("--start-year", type=int, default=1900, help="first year to include (default: full history)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--resamples", type=int, default=0, help="add bootstrap CI / p-value columns with this many resamples")
+    ap.add_argument("--cube", nargs="?", const=_DEFAULT_CUBE, metavar="DIR", help=f"also write memory-mapped return cubes (default dir: {CUBE_DIR}; required with offline data)")
+    args = ap.parse_args(argv)
+    provider = _provider(args.data_dir)
+    if args.cube is _DEFAULT_CUBE:
+        # The default cube directory is what the dashboard serves next to live prices
+        if provider.store_key != "yahoo": ap.error(f"--cube needs an explicit DIR with offline data ({provider.name}); {CUBE_DIR} feeds the dashboard")
+        args.cube = CUBE_DIR
+    store = args.store or store_path(provider)
+
+    tickers, timeframes = read_tickers(args.tickers), tuple(args.timeframes.split(","))
+    t0, tables, failures, rocs = time.perf_counter(), [], {}, {}
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(store, args.data_dir)) as pool:
+        futures = {pool.submit(_job, t, args.start_year, timeframes, bool(args.cube), args.resamples): t for t in tickers}
+        for fut in as_completed(futures):
+            ticker = futures[fut]
+            try:
+                df, rocs[ticker] = fut.result()
+            except Exception as e:
+                failures[ticker] = f"{type(e).__name__}: {e}"
+                continue
+            if args.combined: tables.append(df)
+            else: _write(df, os.path.join(args.out, f"{ticker}_seasonality.{args.format}"), args.format)
+
+    if args.combined and tables:
+        out = args.out if os.path.splitext(args.out)[1] else os.path.join(args.out, f"seasonality.{args.format}")
+        _write(pd.concat(tables, ignore_index=True).sort_values(["Ticker", "Timeframe", "Period"]), out, args.format)
+    if args.cube:
+        ok = [t for t in tickers if t in rocs]
+        for tf in timeframes:
+            write_cube(build_return_cube({t: rocs[t][tf] for t in ok}, tf), args.start_year, args.cube)
+    print(f"Exported {len(tickers) - len(failures)}/{len(tickers)} tickers in {time.perf_counter() - t0:.1f}s")
+    for t, err in failures.items(): print(f"  {t}: {err}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
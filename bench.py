@@ -0,0 +1,152 @@
+"""Offline benchmark suite for the data_engine / plot_engine hot paths.
+
+    python bench.py --scales 1,10,100,1000 --years 30 --out bench_results.json
+    python bench.py --compare bench_results.json      # rerun and print ratios against a previous run
+
+Prices come from the seeded SyntheticProvider, so runs are reproducible and never touch the network.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import FINANCIAL_CRISES, GEOPOLITICAL_WARS, COLORS, DAILY_HORIZONS
+from providers import SyntheticProvider
+from data_engine import rebase_macro, derive_roc_frame, compute_seasonality, compute_cycle_seasonality, compute_rrg, build_csv
+from screener_engine import build_return_cube
+from backtest_engine import backtest
+from event_engine import event_study
+from similarity_engine import SimilarityIndex, seasonal_profiles
+from plot_engine import make_bar_chart, make_cumulative_chart, make_presidential_cycle_chart, make_rebased_macro_chart, make_rrg_chart, figure_payload_bytes
+from figure_codec import compact_figure
+
+def _timeit(fn, repeats: int) -> tuple:
+    times, out = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, times
+
+def _figure_sizes(fig) -> dict:
+    # Raw plotly JSON vs what the dashboard actually ships after figure_codec
+    return {"payload_bytes": figure_payload_bytes(fig), "compact_bytes": figure_payload_bytes(compact_figure(fig)), "traces": len(fig.data)}
+
+def _record(results: list, name: str, scale: int, times: list, **extra):
+    row = {"name": name, "scale": scale, "median_s": statistics.median(times), "min_s": min(times), "repeats": len(times), **extra}
+    results.append(row)
+    size = f"  {extra['payload_bytes'] / 1024:.1f} KiB -> {extra['compact_bytes'] / 1024:.1f} KiB" if "payload_bytes" in extra else ""
+    print(f"{name:<32} n={scale:<6} median {row['median_s'] * 1000:9.2f} ms{size}")
+
+def run(scales: list, years: int, interval: str, repeats: int, seed: int) -> list:
+    provider, results = SyntheticProvider(years=years, seed=seed), []
+    start_year = int(provider.end.year - years + 1)
+    tickers_all = [f"SYN{i:04d}" for i in range(max(scales))]
+    closes = {t: provider.history(t, None, interval)["Close"] for t in tickers_all}
+    spy = provider.history("SPY", None, interval)["Close"]
+
+    for timeframe in ["Weekly", "Monthly", "Daily"]:
+        frames = {t: derive_roc_frame(c, start_year, timeframe) for t, c in closes.items()}
+        for n in scales:
+            subset = tickers_all[:n]
+            datas, times = _timeit(lambda: [compute_seasonality(frames[t], timeframe, start_year) for t in subset], repeats)
+            _record(results, f"compute_seasonality[{timeframe}]", n, times)
+            _, times = _timeit(lambda: [build_csv(d, timeframe) for d in datas], repeats)
+            _record(results, f"build_csv[{timeframe}]", n, times)
+
+        data = compute_seasonality(frames[tickers_all[0]], timeframe, start_year)
+        for wk in ["5", "10", "max"]:
+            fig, times = _timeit(lambda: make_bar_chart(data, wk, True, timeframe, "bench"), repeats)
+            _record(results, f"make_bar_chart[{timeframe},{wk}]", 1, times, **_figure_sizes(fig))
+            fig, times = _timeit(lambda: make_cumulative_chart(data, wk, True, timeframe, "bench"), repeats)
+            _record(results, f"make_cumulative_chart[{timeframe},{wk}]", 1, times, **_figure_sizes(fig))
+
+    for h in DAILY_HORIZONS:
+        for n in scales:
+            subset = tickers_all[:n]
+            _, times = _timeit(lambda: [compute_seasonality(derive_roc_frame(closes[t], start_year, "Daily", h), "Daily", start_year, horizon=h) for t in subset], repeats)
+            _record(results, f"daily_forward[{h}d]", n, times)
+
+    monthly = {t: derive_roc_frame(c, start_year, "Monthly") for t, c in closes.items()}
+    for n in scales:
+        subset = tickers_all[:n]
+        cycles, times = _timeit(lambda: [compute_cycle_seasonality(monthly[t]) for t in subset], repeats)
+        _record(results, "compute_cycle_seasonality", n, times)
+    for n in scales:
+        cube = build_return_cube({t: monthly[t] for t in tickers_all[:n]}, "Monthly")
+        _, times = _timeit(lambda: backtest(cube), repeats)
+        _record(results, "backtest[Monthly]", n, times)
+        names, feats = seasonal_profiles(cube)
+        index = SimilarityIndex("bench", names, feats)
+        _, times = _timeit(lambda: (index.upsert(names[:1], feats[:1], [""]), index.query(names[:10], 10)), repeats)
+        _record(results, "similarity_top10[x10]", n, times)
+    fig, times = _timeit(lambda: make_presidential_cycle_chart(cycles[0]), repeats)
+    _record(results, "make_presidential_cycle_chart", 1, times, **_figure_sizes(fig))
+
+    for n in scales:
+        prices = pd.DataFrame({**{t: closes[t] for t in tickers_all[:n]}, "SPY": spy}).dropna()
+        prices = prices[prices.index >= prices.index[-1] - pd.DateOffset(years=1)]
+        rrg, times = _timeit(lambda: compute_rrg(prices), repeats)
+        _record(results, "compute_rrg", n, times)
+        fig, times = _timeit(lambda: make_rrg_chart(rrg), repeats)
+        _record(results, "make_rrg_chart", n, times, **_figure_sizes(fig))
+
+    for n in sorted({min(s, 8) for s in scales}):
+        macro = {f"US {t}": closes[t].resample("ME").last() for t in tickers_all[:n]}
+        fig, times = _timeit(lambda: make_rebased_macro_chart(rebase_macro(macro), FINANCIAL_CRISES + GEOPOLITICAL_WARS, COLORS["crisis_zone"], "bench"), repeats)
+        _record(results, "make_rebased_macro_chart", n, times, **_figure_sizes(fig))
+
+    events = FINANCIAL_CRISES + GEOPOLITICAL_WARS
+    for n in scales:
+        assets = {t: closes[t] for t in tickers_all[:n]}
+        _, times = _timeit(lambda: event_study(assets, events), repeats)
+        _record(results, "event_study", n, times)
+    return results
+
+def _git_rev() -> str | None:
+    try: return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception: return None
+
+def load_results(path: str) -> dict:
+    with open(path) as fh:
+        return {(r["name"], r["scale"]): r for r in json.load(fh)["results"]}
+
+def compare(current: list, base: dict):
+    print(f"\n{'benchmark':<32} {'scale':>6} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for r in current:
+        b = base.get((r["name"], r["scale"]))
+        if b: print(f"{r['name']:<32} {r['scale']:>6} {b['median_s'] * 1000:12.2f} {r['median_s'] * 1000:12.2f} {r['median_s'] / b['median_s']:7.2f}")
+
+def main(argv: list | None = None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scales", default="1,10,100", help="comma-separated ticker counts")
+    ap.add_argument("--years", type=int, default=30)
+    ap.add_argument("--interval", default="1d", choices=["1d", "1wk", "1mo"], help="bar interval of the synthetic source series")
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", help="previous results file to compare against")
+    args = ap.parse_args(argv)
+
+    scales = sorted({int(s) for s in args.scales.split(",")})
+    baseline = load_results(args.compare) if args.compare else None
+    results = run(scales, args.years, args.interval, args.repeats, args.seed)
+    payload = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"), "git": _git_rev(), "python": sys.version.split()[0],
+            "platform": platform.platform(), "numpy": np.__version__, "pandas": pd.__version__, "args": vars(args)
+        },
+        "results": results
+    }
+    with open(args.out, "w") as fh:
+        json.dump(payload, fh, indent=2)
+    print(f"\nWrote {len(results)} results to {args.out}")
+    if baseline: compare(results, baseline)
+
+if __name__ == "__main__":
+    main()
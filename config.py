@@ -1,7 +1,28 @@
+import os
 from datetime import datetime
 
 CURRENT_YEAR = datetime.today().year
 PLOTLY_TEMPLATE = "plotly_dark"
+# Browser payload: line traces are thinned to about one point per pixel of a wide-layout chart, numbers kept to 2 decimals
+CHART_WIDTH_PX = 1200
+FIGURE_PRECISION = 2
+
+# Local on-disk price store shared by every process (see price_store.py)
+DATA_DIR = os.environ.get("SEASONALITY_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data"))
+# Point at a directory of <TICKER>_<interval>.csv files (or "synthetic" for generated bars) to run fully offline
+FIXTURE_DIR = os.environ.get("SEASONALITY_FIXTURE_DIR")
+STORE_REFRESH_SECONDS = 3600
+# Memory-mapped seasonality cubes written by `batch_export.py --cube` (see cube_store.py)
+CUBE_DIR = os.path.join(DATA_DIR, "cube")
+
+# Timeframe -> (period label, periods per year). "Daily" is the trading day of the year; a rare 253rd
+# session is dropped the same way ISO week 53 is.
+TIMEFRAMES = {"Weekly": ("Week", 52), "Monthly": ("Month", 12), "Daily": ("Trading Day", 252)}
+# Forward-return horizons in trading days for the Daily timeframe; 1 is the plain day-over-day return
+DAILY_HORIZONS = [1, 5, 10, 21]
+# Bootstrap / sign-flip resamples per period and window for the significance overlay (see significance_engine.py)
+SIGNIFICANCE_RESAMPLES = 10000
+SIGNIFICANCE_CONFIDENCE = 0.95
 
 COLORS = {
     "pos_bar":    "#555555",   
@@ -28,7 +49,8 @@ COLORS = {
     "oil":        "#00FF00",  
     "tnx":        "#B0C4DE",  
     "crisis_zone": "rgba(255, 68, 68, 0.12)",   
-    "war_zone":    "rgba(255, 165, 0, 0.15)"    
+    "war_zone":    "rgba(255, 165, 0, 0.15)",
+    "custom_zone": "rgba(0, 229, 255, 0.12)"
 }
 
 FINANCIAL_CRISES = [
@@ -85,6 +107,21 @@ SECTORS = {
     "Real Estate (XLRE)": "XLRE", "Communication (XLC)": "XLC"
 }
 
+SCREENER_UNIVERSE = [
+    "SPY", "QQQ", "DIA", "IWM", "MDY", "EFA", "EEM", "TLT", "IEF", "HYG", "GLD", "SLV", "USO", "UNG",
+    "XLK", "XLF", "XLV", "XLE", "XLY", "XLP", "XLI", "XLU", "XLB", "XLRE", "XLC",
+    "SMH", "XBI", "KRE", "XHB", "ITB", "XRT", "KWEB", "FXI", "EWJ", "EWZ", "INDA"
+]
+
+MACRO_ASSETS = {
+    "US (^GSPC)": "^GSPC", "Canada (^GSPTSE)": "^GSPTSE", "India (^NSEI)": "^NSEI",
+    "Gold (GC=F)": "GC=F", "Bitcoin (BTC-USD)": "BTC-USD", "Volatility (^VIX)": "^VIX",
+    "Crude Oil (CL=F)": "CL=F", "10Yr Yield (^TNX)": "^TNX"
+}
+
+# Datasets behind the secondary tabs, warmed in the background once the first tab has rendered
+PREFETCH_TICKERS = list(dict.fromkeys(["^GSPC"] + list(MACRO_ASSETS.values()) + list(SECTORS.values()) + ["SPY"]))
+
 SECTOR_COLORS = {
     "XLK": "#00E5FF", "XLF": "#39FF14", "XLV": "#FF3333", "XLE": "#FFA500",
     "XLY": "#FF00FF", "XLP": "#FFFF00", "XLI": "#8A2BE2", "XLU": "#00BFFF",
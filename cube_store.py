@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import CUBE_DIR, CURRENT_YEAR
+
+# Layout per timeframe: <dir>/<Timeframe>.npy holds a float32 (ticker x year x period) return cube and
+# <dir>/<Timeframe>.json its small index. Readers memory-map the .npy read-only, so every session and
+# worker process on the host shares the same page-cache pages instead of holding private copies.
+
+def _paths(directory: str, timeframe: str) -> tuple:
+    return os.path.join(directory, f"{timeframe}.npy"), os.path.join(directory, f"{timeframe}.json")
+
+def write_cube(cube_data: dict, start_year: int, directory: str = CUBE_DIR) -> str:
+    # cube_data as returned by screener_engine.build_return_cube from frames cut at start_year
+    os.makedirs(directory, exist_ok=True)
+    npy, meta = _paths(directory, cube_data["timeframe"])
+    cube = np.asarray(cube_data["cube"], dtype=np.float32)
+    first_year = int(cube_data["years"][0]) if len(cube_data["years"]) else CURRENT_YEAR
+    has = ~np.isnan(cube).all(axis=2)
+    index = {
+        "timeframe": cube_data["timeframe"], "tickers": list(cube_data["tickers"]),
+        "first_year": first_year, "n_periods": int(cube.shape[2]), "start_year": int(start_year),
+        # First year holding data, per ticker: with start_year it tells a short history from a truncated one
+        "ticker_first_years": [first_year + int(np.argmax(h)) for h in has],
+        "built_at": datetime.now().isoformat(timespec="seconds"), "built_year": datetime.now().year
+    }
+    # Replace atomically: processes that already mapped the old file keep a valid mapping
+    np.save(npy + ".tmp.npy", cube)
+    with open(meta + ".tmp", "w") as fh:
+        json.dump(index, fh)
+    os.replace(npy + ".tmp.npy", npy)
+    os.replace(meta + ".tmp", meta)
+    return npy
+
+class CubeView:
+    def __init__(self, npy: str, meta: dict):
+        self.cube = np.load(npy, mmap_mode="r")
+        self.meta, self.timeframe = meta, meta["timeframe"]
+        self.tickers = {t: i for i, t in enumerate(meta["tickers"])}
+        self.years = np.arange(meta["first_year"], meta["first_year"] + self.cube.shape[1])
+        self.periods = pd.RangeIndex(1, self.cube.shape[2] + 1, name="period")
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.tickers
+
+    @property
+    def fresh(self) -> bool:
+        # Built this year, so every completed year is in it; the live current year always comes from the store
+        return self.meta.get("built_year") == CURRENT_YEAR
+
+    def covers(self, ticker: str, start_year: int | None = None) -> bool:
+        # Holds every year from max(start_year, the ticker's first year) on. A ticker whose data begins at the
+        # export's own start year may have been cut there, so earlier requests fall back to the full history.
+        # Cubes written without a start year cover nothing.
+        if ticker not in self.tickers or self.meta.get("start_year") is None: return False
+        if start_year is not None and start_year >= self.meta["start_year"]: return True
+        return self.meta["ticker_first_years"][self.tickers[ticker]] > self.meta["start_year"]
+
+    def pivot(self, ticker: str, start_year: int | None = None, end_year: int = CURRENT_YEAR - 1) -> pd.DataFrame | None:
+        # (year x period) frame for one ticker, shaped like compute_seasonality's pivot. The usual case - a
+        # contiguous run of years - is a zero-copy view into the mapped file. None unless the cube reaches back
+        # far enough for start_year.
+        if not self.covers(ticker, start_year): return None
+        block = self.cube[self.tickers[ticker]]
+        keep = ~np.isnan(block).all(axis=1) & (self.years <= end_year)
+        if start_year is not None: keep &= self.years >= start_year
+        rows = np.flatnonzero(keep)
+        if len(rows) == 0: return None
+        arr = block[rows[0]:rows[-1] + 1] if rows[-1] - rows[0] + 1 == len(rows) else block[rows]
+        return pd.DataFrame(arr, index=pd.Index(self.years[rows], name="year"), columns=self.periods, copy=False)
+
+_views, _views_lock = {}, threading.Lock()
+
+def open_cube(timeframe: str, directory: str = CUBE_DIR) -> CubeView | None:
+    # One mapping per file per process; a rebuilt cube (new mtime) replaces the old mapping, which is
+    # unmapped once the last result still viewing it is gone
+    npy, meta = _paths(directory, timeframe)
+    try:
+        version = (os.path.getmtime(npy), os.path.getmtime(meta))
+    except OSError:
+        return None
+    with _views_lock:
+        cached = _views.get(npy)
+        if cached is None or cached[0] != version:
+            with open(meta) as fh:
+                _views[npy] = (version, CubeView(npy, json.load(fh)))
+        return _views[npy][1]
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from config import CURRENT_YEAR
+from path_engine import cumulative_paths
+
+# (cycle length in years, anchor year of phase 0). Presidential: post-election years (1981, 1985, ...) open the cycle.
+CYCLES = {
+    "Presidential": (4, 1),
+    "Midterm": (4, 2),
+    "Decennial": (10, 0),
+}
+
+def cycle_position(years: np.ndarray, periods: np.ndarray, length: int, anchor: int, periods_per_year: int = 12) -> tuple:
+    # Returns (cycle start year, 1-based period within the cycle) for every observation
+    phase = (years - anchor) % length
+    return years - phase, phase * periods_per_year + periods
+
+def current_cycle_start(length: int, anchor: int, year: int = CURRENT_YEAR) -> int:
+    return year - (year - anchor) % length
+
+def _compound(roc: np.ndarray) -> np.ndarray:
+    # Cumulative % path after each period (no leading anchor column)
+    return cumulative_paths(roc)[..., 1:]
+
+def _trim_to_coverage(paths: np.ndarray, roc: np.ndarray) -> np.ndarray:
+    # Blank a path before its first and after its last observation so partial cycles don't skew the bands
+    valid = ~np.isnan(roc)
+    seen = np.maximum.accumulate(valid, axis=-1)
+    left = np.maximum.accumulate(valid[..., ::-1], axis=-1)[..., ::-1]
+    return np.where(seen & left, paths, np.nan)
+
+def compute_cycle(years: np.ndarray, periods: np.ndarray, roc: np.ndarray, length: int = 4, anchor: int = 1,
+                  periods_per_year: int = 12, band: tuple = (10, 90), current_year: int = CURRENT_YEAR) -> dict:
+    years, periods, roc = np.asarray(years, dtype=int), np.asarray(periods, dtype=int), np.asarray(roc, dtype=float)
+    n = length * periods_per_year
+    starts, pos = cycle_position(years, periods, length, anchor, periods_per_year)
+    first = starts.min() if len(starts) else current_year
+    cycle_starts = np.arange(first, max(starts.max() if len(starts) else first, first) + 1, length)
+
+    # (cycle x cycle-period) return matrix filled by scatter instead of a per-row apply
+    mat = np.full((len(cycle_starts), n), np.nan)
+    ok = (pos >= 1) & (pos <= n)
+    mat[(starts[ok] - first) // length, pos[ok] - 1] = roc[ok]
+
+    cur_start = current_cycle_start(length, anchor, current_year)
+    hist = mat[cycle_starts < cur_start]
+    cur = mat[cycle_starts == cur_start][0] if (cycle_starts == cur_start).any() else np.full(n, np.nan)
+    paths = _trim_to_coverage(_compound(hist), hist)
+
+    with np.errstate(all="ignore"):
+        avg = np.nanmean(hist, axis=0) if len(hist) else np.full(n, np.nan)
+        lo, mid, hi = (np.nanpercentile(paths, q, axis=0) if len(paths) else np.full(n, np.nan) for q in (band[0], 50, band[1]))
+
+    idx = pd.RangeIndex(1, n + 1, name="cycle_month")
+    cur_s = pd.Series(cur, index=idx)
+    return {
+        "avg_roc": pd.Series(avg, index=idx).dropna(), "avg_path": pd.Series(_compound(np.nan_to_num(avg)), index=idx),
+        "cur_roc": cur_s.dropna(),
+        "cycle_returns": pd.DataFrame(hist, index=cycle_starts[cycle_starts < cur_start], columns=idx),
+        "cycle_paths": pd.DataFrame(paths, index=cycle_starts[cycle_starts < cur_start], columns=idx),
+        "bands": pd.DataFrame({"lo": lo, "median": mid, "hi": hi}, index=idx),
+        "current_cycle_start": cur_start, "length": length, "anchor": anchor
+    }
+
+def compute_cycle_universe(cube: np.ndarray, years: np.ndarray, length: int = 4, anchor: int = 1, current_year: int = CURRENT_YEAR) -> dict:
+    # cube: (ticker x year x period) returns. Years are padded so each cycle lines up, then reshaped to
+    # (ticker x cycle x cycle-period): every phase for every ticker comes out of the same reductions.
+    t, _, ppy = cube.shape
+    lead = int((years[0] - anchor) % length)
+    trail = (-(lead + len(years))) % length
+    padded = np.concatenate([np.full((t, lead, ppy), np.nan), cube, np.full((t, trail, ppy), np.nan)], axis=1)
+    cycles = padded.reshape(t, -1, length * ppy)
+    cycle_starts = years[0] - lead + np.arange(cycles.shape[1]) * length
+
+    cur_start = current_cycle_start(length, anchor, current_year)
+    hist = cycles[:, cycle_starts < cur_start]
+    with np.errstate(all="ignore"):
+        avg = np.nanmean(hist, axis=1)
+        win = (hist > 0).sum(axis=1) / (~np.isnan(hist)).sum(axis=1) * 100
+    cur = cycles[:, cycle_starts == cur_start][:, 0] if (cycle_starts == cur_start).any() else np.full((t, length * ppy), np.nan)
+    return {
+        "avg_roc": avg, "wr": win, "avg_path": _compound(np.nan_to_num(avg)), "cur_roc": cur,
+        "cycle_starts": cycle_starts, "current_cycle_start": cur_start
+    }
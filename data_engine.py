@@ -1,86 +1,212 @@
+import io
+import threading
 import streamlit as st
 import pandas as pd
-import yfinance as yf
+import numpy as np
 from datetime import datetime
-from config import CURRENT_YEAR
+from config import CURRENT_YEAR, TIMEFRAMES, SIGNIFICANCE_RESAMPLES, SIGNIFICANCE_CONFIDENCE
+from price_store import get_store
+from telemetry import timed
+from fetch_engine import FetchReport, fetch_many
+from screener_engine import build_return_cube, stack_return_cube, slice_cube_years, period_count
+from cycle_engine import CYCLES, compute_cycle
+from rrg_engine import compute_rrg_history, rrg_tail, advance_rrg_state
+from shared_cache import get_shared_cache
+from cube_store import open_cube
+from significance_engine import seasonal_significance
+from similarity_engine import SimilarityIndex, seasonal_profiles, cycle_profiles
+from memo_cache import fingerprint
 
+@timed("fetch")
+def load_daily_closes(tickers: list, max_workers: int = 8) -> FetchReport:
+    # Concurrent, retried loads of the canonical daily series; failures are reported per ticker. Series the
+    # store already has fresh come back in one bulk read, and only the rest go through the fetch scheduler.
+    store, tickers = get_store(), list(dict.fromkeys(tickers))
+    def _load(t):
+        close = store.load_close(t, "1d")
+        if close.empty: raise ValueError(f"No data returned for {t}")
+        return close
+    stale = set(store.stale(tickers, "1d"))
+    report = fetch_many([t for t in tickers if t in stale], _load, max_workers=max_workers)
+    fresh = store.read_closes([t for t in tickers if t not in stale], "1d")
+    for t in tickers:
+        if t in fresh: report.results[t] = fresh[t]
+        elif t not in stale: report.failures[t] = f"ValueError: No data returned for {t}"
+    report.results = {t: report.results[t] for t in tickers if t in report.results}
+    if report.failures: print(f"Fetch: {report.summary()} | {report.failures}")
+    return report
+
+_prefetched, _prefetch_lock = set(), threading.Lock()
+
+def prefetch_daily_closes(tickers: list) -> threading.Thread | None:
+    # Fire-and-forget warm-up of the on-disk store. Runs once per ticker per process; later loads then
+    # read from disk instead of the network. Touches no Streamlit API, so it is safe off the script thread.
+    with _prefetch_lock:
+        todo = [t for t in tickers if t not in _prefetched]
+        _prefetched.update(todo)
+    if not todo: return None
+    worker = threading.Thread(target=load_daily_closes, args=(todo,), name="store-prefetch", daemon=True)
+    worker.start()
+    return worker
+
+@timed("fetch")
 @st.cache_data(ttl=3600, show_spinner=False)
-def fetch_seasonality_data_v5(ticker: str, start_year: int, timeframe: str) -> pd.DataFrame | None:
+def fetch_daily_close(ticker: str) -> pd.Series | None:
+    # The one network-facing series per ticker: maximum-history daily closes from the local store.
+    # Every weekly/monthly/start-year view below is derived from it in memory.
+    return load_daily_closes([ticker]).results.get(ticker)
+
+def resample_close(close: pd.Series, timeframe: str) -> pd.Series:
+    # Last close per period, labelled by the period's first day. Same result as resample(...).last(),
+    # without generating a calendar of bins.
+    close = close.dropna()
+    days = close.index.values.astype("datetime64[D]")
+    if timeframe == "Weekly":
+        # Monday-labelled weeks, matching Yahoo's 1wk bars so ISO week numbers line up (1970-01-01 was a Thursday)
+        labels = days - (days.astype("int64") + 3) % 7
+    else:
+        labels = days.astype("datetime64[M]").astype("datetime64[D]")
+    last = np.append(labels[1:] != labels[:-1], True) if len(labels) else np.array([], dtype=bool)
+    return pd.Series(close.to_numpy()[last], index=pd.DatetimeIndex(labels[last].astype(close.index.values.dtype)), name=close.name)
+
+def forward_returns(close: np.ndarray, horizon: int = 1) -> np.ndarray:
+    # Return over the `horizon` sessions starting at each bar: close[i+h-1] / close[i-1] - 1, NaN where the
+    # window is incomplete. Two shifted slices, so every start day and horizon costs one array division.
+    out = np.full(len(close), np.nan)
+    if len(close) > horizon: out[1:len(close) - horizon + 1] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+def trading_day_of_year(index: pd.DatetimeIndex) -> np.ndarray:
+    # 1-based session number within each calendar year of a sorted daily index
+    years, pos = index.year.to_numpy(), np.arange(len(index))
+    first = np.maximum.accumulate(np.where(np.r_[True, years[1:] != years[:-1]], pos, 0)) if len(index) else pos
+    return pos - first + 1
+
+def roc_arrays(close: pd.Series, timeframe: str, horizon: int = 1) -> tuple:
+    # (labels, year, period, roc %) for every complete period of the full history, numpy only. derive_roc_frame
+    # and the universe cube both build on it.
+    close = close.dropna()
+    if timeframe == "Daily":
+        days = close.index.values.astype("datetime64[D]")
+        years = days.astype("datetime64[Y]").astype(int) + 1970
+        roc, period = forward_returns(close.to_numpy(dtype=float), horizon) * 100, trading_day_of_year(close.index)
+        keep = (period <= TIMEFRAMES["Daily"][1]) & ~np.isnan(roc)
+        # A history that starts mid-year would number that year's sessions from the wrong day, so drop it
+        if len(days) and (days[0] - days[0].astype("datetime64[Y]")).astype(int) >= 7: keep &= years != years[0]
+        return close.index[keep], years[keep], period[keep], roc[keep]
+    period_close = resample_close(close, timeframe)
+    c, labels = period_close.to_numpy(dtype=float), period_close.index[1:]
+    roc = (c[1:] / c[:-1] - 1) * 100
+    if timeframe == "Weekly":
+        # ISO year and week are those of the week's Thursday
+        thu = labels.values.astype("datetime64[D]") + 3
+        jan1 = thu.astype("datetime64[Y]")
+        return labels, jan1.astype(int) + 1970, (thu - jan1.astype("datetime64[D]")).astype(int) // 7 + 1, roc
+    months = labels.values.astype("datetime64[M]").astype(int)
+    return labels, months // 12 + 1970, months % 12 + 1, roc
+
+@timed("compute")
+def derive_roc_frame(close: pd.Series, start_year: int, timeframe: str, horizon: int = 1) -> pd.DataFrame:
+    labels, year, period, roc = roc_arrays(close, timeframe, horizon)
+    keep = year >= start_year
+    roc_df = pd.DataFrame({"roc": roc[keep], "year": year[keep], "period": period[keep]}, index=labels[keep])
+    if timeframe == "Weekly" and roc_df.loc[roc_df["period"] == 53, "year"].nunique() < 3:
+        roc_df = roc_df[roc_df["period"] != 53]
+    return roc_df
+
+@timed("fetch")
+def fetch_seasonality_data_v5(ticker: str, start_year: int, timeframe: str, horizon: int = 1) -> pd.DataFrame | None:
     try:
-        start_str = f"{start_year - 1}-11-01"
-        interval = "1wk" if timeframe == "Weekly" else "1mo"
-        
-        # Fetch data
-        df = yf.download(ticker, start=start_str, interval=interval, auto_adjust=False, progress=False)
-        if df.empty: return None
-        
-        # Bulletproof column extraction (handles new yfinance MultiIndex updates)
-        if isinstance(df.columns, pd.MultiIndex):
-            close = df["Close"][ticker]
-        else:
-            close = df["Close"].squeeze() if isinstance(df["Close"], pd.DataFrame) else df["Close"]
-            
-        roc = close.dropna().pct_change() * 100
-        roc_df = roc.to_frame(name="roc")
-        roc_df.index = pd.to_datetime(roc_df.index)
-        
-        if timeframe == "Weekly":
-            roc_df["year"] = roc_df.index.isocalendar().year.astype(int)
-            roc_df["period"] = roc_df.index.isocalendar().week.astype(int)
-            if roc_df[roc_df["period"] == 53]["year"].nunique() < 3: 
-                roc_df = roc_df[roc_df["period"] != 53]
-        else:
-            roc_df["year"] = roc_df.index.year
-            roc_df["period"] = roc_df.index.month
-            
-        return roc_df[roc_df["year"] >= start_year]
+        close = fetch_daily_close(ticker)
+        if close is None: return None
+        roc_df = derive_roc_frame(close, start_year, timeframe, horizon)
+        return roc_df if not roc_df.empty else None
     except Exception as e:
         print(f"Error fetching {ticker}: {e}")
         return None
 
+@timed("fetch")
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_universe_closes(tickers: tuple) -> tuple[dict, dict]:
+    # Read once per universe: start year, timeframe and horizon changes all reuse these series
+    report = load_daily_closes(list(tickers))
+    return report.results, report.failures
+
+@timed("compute")
+@st.cache_data(ttl=3600, show_spinner=False)
+def _full_universe_cube(tickers: tuple, timeframe: str, horizon: int = 1) -> dict:
+    closes, failures = fetch_universe_closes(tickers)
+    cube = stack_return_cube({t: roc_arrays(c, timeframe, horizon)[1:] for t, c in closes.items()}, timeframe)
+    cube["failures"] = failures
+    return cube
+
+def fetch_universe_cube(tickers: tuple, start_year: int, timeframe: str, horizon: int = 1) -> dict:
+    # Full-history cube per (universe, timeframe, horizon); the start year is just a cut of its year axis
+    return slice_cube_years(_full_universe_cube(tickers, timeframe, horizon), start_year)
+
+@timed("fetch")
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_similarity_index(tickers: tuple, start_year: int, timeframe: str = "Weekly", profile: str = "Seasonal", window: str = "max") -> tuple[SimilarityIndex, dict]:
+    # Persistent and incremental: only tickers whose daily history changed since the last build are re-profiled.
+    # Cycle profiles always come from monthly returns.
+    tf = timeframe if profile == "Seasonal" else "Monthly"
+    index = SimilarityIndex.load(f"{profile}_{tf}_{window}_{start_year}" if profile == "Seasonal" else f"{profile}_{start_year}")
+    report = load_daily_closes(list(tickers))
+    stamps = {t: fingerprint(c) for t, c in report.results.items()}
+    stale = index.stale(stamps)
+    if stale:
+        cube = build_return_cube({t: derive_roc_frame(report.results[t], start_year, tf) for t in stale}, tf)
+        names, feats = seasonal_profiles(cube, window) if profile == "Seasonal" else cycle_profiles(cube, *CYCLES[profile])
+        index.upsert(names, feats, [stamps[t] for t in names])
+        index.save()
+    return index, report.failures
+
+@timed("fetch")
 @st.cache_data(ttl=3600, show_spinner=False)
 def fetch_presidential_cycle_data() -> pd.DataFrame | None:
     try:
-        df = yf.download("^GSPC", start="1980-12-01", interval="1mo", auto_adjust=False, progress=False)
-        if df.empty: return None
-        
-        if isinstance(df.columns, pd.MultiIndex):
-            close = df["Close"]["^GSPC"]
-        else:
-            close = df["Close"].squeeze() if isinstance(df["Close"], pd.DataFrame) else df["Close"]
-            
-        roc_df = (close.dropna().pct_change() * 100).to_frame(name="roc")
-        roc_df.index = pd.to_datetime(roc_df.index)
-        roc_df["year"], roc_df["period"] = roc_df.index.year, roc_df.index.month
-        return roc_df[roc_df["year"] >= 1981]
+        close = fetch_daily_close("^GSPC")
+        if close is None: return None
+        return derive_roc_frame(close, 1981, "Monthly")
     except: return None
 
+@timed("fetch")
 @st.cache_data(ttl=3600, show_spinner=False)
-def fetch_global_macro_data() -> dict:
-    tickers = {"US (^GSPC)": "^GSPC", "Canada (^GSPTSE)": "^GSPTSE", "India (^NSEI)": "^NSEI", 
-               "Gold (GC=F)": "GC=F", "Bitcoin (BTC-USD)": "BTC-USD", "Volatility (^VIX)": "^VIX", 
-               "Crude Oil (CL=F)": "CL=F", "10Yr Yield (^TNX)": "^TNX"}
-    data_dict = {}
+def fetch_macro_closes() -> tuple[dict, dict]:
+    # Daily closes per macro asset name; the monthly chart data and the event study both derive from these
+    from config import MACRO_ASSETS as tickers
+    report = load_daily_closes(list(tickers.values()))
+    closes, failures = {}, {}
     for name, ticker in tickers.items():
-        try:
-            df = yf.download(ticker, start="1927-12-01", interval="1d", auto_adjust=False, progress=False)
-            if not df.empty:
-                if isinstance(df.columns, pd.MultiIndex):
-                    close = df["Close"][ticker]
-                else:
-                    close = df["Close"].squeeze() if isinstance(df["Close"], pd.DataFrame) else df["Close"]
-                data_dict[name] = close.dropna().resample("ME").last().dropna()
-        except: pass
-    return data_dict
-
-def compute_seasonality(roc_df: pd.DataFrame, timeframe: str, start_year: int) -> dict:
-    periods = list(range(1, 53)) if timeframe == "Weekly" else list(range(1, 13))
+        if ticker in report.results: closes[name] = report.results[ticker]
+        else: failures[name] = report.failures.get(ticker, "unknown error")
+    return closes, failures
+
+@timed("fetch")
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_global_macro_data() -> tuple[dict, dict]:
+    closes, failures = fetch_macro_closes()
+    return {name: close[close.index >= "1927-12-01"].resample("ME").last().dropna() for name, close in closes.items()}, failures
+
+def rebase_macro(data_dict: dict) -> pd.DataFrame:
+    # Common-history frame rebased to 100; built once and shared by every macro chart
+    df = pd.DataFrame(data_dict).dropna()
+    return df / df.iloc[0] * 100 if not df.empty else df
+
+@timed("compute")
+def compute_seasonality(roc_df: pd.DataFrame, timeframe: str, start_year: int, hist_pivot: pd.DataFrame | None = None, horizon: int = 1) -> dict:
+    periods = list(range(1, period_count(timeframe) + 1))
     today = datetime.today()
-    cur_period = today.isocalendar().week if timeframe == "Weekly" else today.month
-    
     cur_data = roc_df[roc_df["year"] == CURRENT_YEAR]
+    if timeframe == "Daily":
+        # Today's session: the last start day with a complete forward window, plus the window length
+        cur_period = int(cur_data["period"].max()) + horizon - 1 if len(cur_data) else int(np.busday_count(f"{CURRENT_YEAR}-01-01", today.date())) + 1
+    else:
+        cur_period = today.isocalendar().week if timeframe == "Weekly" else today.month
+    
     hist_data = roc_df[roc_df["year"] < CURRENT_YEAR]
-    pivot = hist_data.pivot_table(index="year", columns="period", values="roc")
+    # hist_pivot: completed years already laid out as (year x period), e.g. a zero-copy cube_store view
+    pivot = hist_pivot if hist_pivot is not None else hist_data.pivot_table(index="year", columns="period", values="roc")
     
     def _avg(p): return p.mean()
     def _wr(p): return (p > 0).sum() / p.notna().sum() * 100
@@ -98,60 +224,89 @@ def compute_seasonality(roc_df: pd.DataFrame, timeframe: str, start_year: int) -
         "periods": periods, "avg_5": _avg(pv5), "avg_10": _avg(pv10), "avg_max": _avg(pivot),
         "wr_5": _wr(pv5), "wr_10": _wr(pv10), "wr_max": _wr(pivot),
         "cur_roc": cur_roc,
-        "pivot": pivot, "completed_years": sorted(hist_data["year"].unique()), 
+        "pivot": pivot, "completed_years": sorted(pivot.index.tolist()), 
         "current_period": cur_period, "start_year": start_year
     }
 
-def compute_cycle_seasonality(roc_df: pd.DataFrame) -> dict:
-    def get_cycle_month(y, m):
-        rem = y % 4
-        offsets = {1: 0, 2: 12, 3: 24, 0: 36}
-        return offsets.get(rem, 0) + m
-        
-    roc_df["cycle_month"] = roc_df.apply(lambda r: get_cycle_month(r["year"], r["period"]), axis=1)
-    start = CURRENT_YEAR - ((CURRENT_YEAR - 1) % 4)
-    
-    hist_data, cur_data = roc_df[roc_df["year"] < start], roc_df[roc_df["year"] >= start]
-    return {
-        "avg_roc": hist_data.groupby("cycle_month")["roc"].mean(),
-        "cur_roc": cur_data.set_index("cycle_month")["roc"] if not cur_data.empty else pd.Series(dtype=float),
-        "current_cycle_start": start
-    }
+@timed("compute")
+def compute_cycle_seasonality(roc_df: pd.DataFrame, cycle: str = "Presidential") -> dict:
+    length, anchor = CYCLES[cycle]
+    return compute_cycle(roc_df["year"].to_numpy(), roc_df["period"].to_numpy(), roc_df["roc"].to_numpy(), length, anchor)
 
+@timed("compute")
+def compute_significance(data: dict, n_resamples: int = SIGNIFICANCE_RESAMPLES, confidence: float = SIGNIFICANCE_CONFIDENCE, seed: int = 0) -> dict:
+    return seasonal_significance(data["pivot"], data["periods"], n_resamples, confidence, seed)
+
+def seasonality_table(data: dict, timeframe: str, sig: dict | None = None) -> pd.DataFrame:
+    # One reindex per column instead of a dict of .get() lookups per period
+    periods = pd.Index(data["periods"])
+    cols = {TIMEFRAMES[timeframe][0].replace(" ", "_"): periods.to_numpy()}
+    for col, key, nd in [("Avg_5yr_%", "avg_5", 4), ("Avg_10yr_%", "avg_10", 4), ("Avg_Max_%", "avg_max", 4),
+                         ("WinRate_5yr", "wr_5", 1), ("WinRate_10yr", "wr_10", 1), ("WinRate_Max", "wr_max", 1),
+                         (f"{CURRENT_YEAR}_Actual_%", "cur_roc", 4)]:
+        cols[col] = data[key].reindex(periods).to_numpy(dtype=float).round(nd)
+    if sig is not None:
+        for w, lbl in [("5", "5yr"), ("10", "10yr"), ("max", "Max")]:
+            for col, key, nd in [(f"Avg_{lbl}_CI_Lo_%", f"avg_{w}_lo", 4), (f"Avg_{lbl}_CI_Hi_%", f"avg_{w}_hi", 4), (f"Avg_{lbl}_p", f"p_avg_{w}", 4),
+                                 (f"WinRate_{lbl}_CI_Lo", f"wr_{w}_lo", 1), (f"WinRate_{lbl}_CI_Hi", f"wr_{w}_hi", 1), (f"WinRate_{lbl}_p", f"p_wr_{w}", 4)]:
+                cols[col] = sig[key].reindex(periods).to_numpy(dtype=float).round(nd) if key in sig else np.nan
+    return pd.DataFrame(cols)
+
+@timed("compute")
+def build_csv(data: dict, timeframe: str, sig: dict | None = None) -> bytes:
+    buf = io.BytesIO()
+    seasonality_table(data, timeframe, sig).to_csv(buf, index=False)
+    return buf.getvalue()
+
+@timed("fetch")
 @st.cache_data(ttl=3600, show_spinner=False)
-def fetch_sector_data() -> pd.DataFrame | None:
+def fetch_sector_data(lookback_years: int = 1) -> pd.DataFrame | None:
     from config import SECTORS
     tickers = list(SECTORS.values()) + ["SPY"]
     try:
-        # Fetch 1 year of daily data to compute accurate moving averages
-        df = yf.download(tickers, period="1y", interval="1d", auto_adjust=False, progress=False)
-        if df.empty: return None
-        if isinstance(df.columns, pd.MultiIndex):
-            return df["Close"].dropna()
-        return None 
+        # At least 1 year of daily data to compute accurate moving averages
+        start = pd.Timestamp.today().normalize() - pd.DateOffset(years=lookback_years)
+        report = load_daily_closes(tickers)
+        if "SPY" not in report.results: return None
+        df = pd.DataFrame(report.results)
+        df = df[df.index >= start].dropna()
+        return df if not df.empty else None
     except Exception as e:
         print(f"Sector Fetch Error: {e}")
         return None
 
-def compute_rrg(df: pd.DataFrame) -> dict | None:
-    if df is None or "SPY" not in df.columns: return None
-    
-    # 1. Calculate Relative Strength (RS) vs SPY
-    rs_df = df.div(df["SPY"], axis=0).drop(columns=["SPY"])
-    
-    # 2. RS-Ratio (X-Axis): Smoothed 14-week (70 trading days) trend, normalized to 100
-    rs_ratio = (rs_df / rs_df.rolling(window=70).mean()) * 100
-    
-    # 3. RS-Momentum (Y-Axis): Smoothed 2-week (10 trading days) speed of the ratio, normalized to 100
-    rs_momentum = (rs_ratio / rs_ratio.rolling(window=10).mean()) * 100
-    
-    rs_ratio, rs_momentum = rs_ratio.dropna(), rs_momentum.dropna()
-    if rs_ratio.empty or rs_momentum.empty: return None
-    
-    # Return the last 15 days to plot the visual "tail" of the rotation
-    tail_length = 15
-    return {
-        "ratio": rs_ratio.tail(tail_length),
-        "momentum": rs_momentum.tail(tail_length),
-        "current_date": rs_ratio.index[-1].strftime("%b %d, %Y")
-    }
+@timed("compute")
+def compute_rrg(df: pd.DataFrame, benchmark="SPY", tail_length: int = 15, end=None) -> dict | None:
+    if df is None or (not isinstance(benchmark, dict) and benchmark not in df.columns): return None
+    # RS-Ratio (X-Axis): RS vs benchmark over its 70-day mean; RS-Momentum (Y-Axis): RS-Ratio over its 10-day mean.
+    # Returns the last `tail_length` days up to `end` to plot the visual "tail" of the rotation.
+    return rrg_tail(compute_rrg_history(df, benchmark), tail_length, end)
+
+def shared_compute_seasonality(roc_df: pd.DataFrame, timeframe: str, start_year: int, hist_pivot: pd.DataFrame | None = None, horizon: int = 1) -> dict:
+    # Cross-process tier: every replica reuses the first one's result for identical inputs. A cube-backed
+    # pivot skips it: the pickled copy would replace the shared memory-mapped view, and the stats on top
+    # of a view are cheap to recompute.
+    if hist_pivot is not None: return compute_seasonality(roc_df, timeframe, start_year, hist_pivot, horizon)
+    return get_shared_cache().call(compute_seasonality, roc_df, timeframe, start_year, hist_pivot, horizon)
+
+def cube_pivot(ticker: str, timeframe: str, start_year: int) -> pd.DataFrame | None:
+    # Completed-year pivot from the shared memory-mapped cube, when one was built this year and holds the ticker
+    # back to start_year; otherwise None and the caller pivots the live frame
+    view = open_cube(timeframe)
+    return view.pivot(ticker, start_year) if view is not None and view.fresh else None
+
+_rrg_states, _rrg_lock = {}, threading.Lock()
+
+@timed("compute")
+def update_rrg_history(df: pd.DataFrame, benchmark="SPY") -> dict:
+    # Rolling RRG state per universe in this process: a store refresh that adds bars only pushes those bars
+    # through the rolling means. The kept state stops at the second-newest bar, because the newest may
+    # still be forming; it is applied to a copy for this result.
+    if len(df) < 2: return compute_rrg_history(df, benchmark)
+    key = (tuple(df.columns), repr(benchmark))
+    with _rrg_lock:
+        state = _rrg_states[key] = advance_rrg_state(_rrg_states.get(key), df.iloc[:-1], benchmark)
+        state.snapshot(df.index[0])
+        head = state.copy()
+    head.update(df.index[-1], df.iloc[-1])
+    return head.snapshot()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+# Interval lookups over one asset's sorted daily series: event bounds come from searchsorted, window
+# minima and "first bar back above a level" from sparse tables, so every event of an asset is answered in a
+# handful of array ops however many events (or user-defined ones) there are.
+
+def _sparse_tables(v: np.ndarray) -> tuple:
+    # argmin[k, i] / max[k, i] cover v[i : i + 2**k]; rows are padded past the end so queries stay vectorized
+    n = len(v)
+    K = max(int(np.log2(n)) + 1, 1) if n else 1
+    arg, mx = np.zeros((K, n), dtype=np.int64), np.full((K, n), -np.inf)
+    arg[0], mx[0] = np.arange(n), v
+    for k in range(1, K):
+        h = 1 << (k - 1)
+        a, b = arg[k - 1, :n - h], arg[k - 1, h:]
+        arg[k, :n - h] = np.where(v[b] < v[a], b, a)
+        mx[k, :n - h] = np.maximum(mx[k - 1, :n - h], mx[k - 1, h:])
+    return arg, mx
+
+def _range_argmin(v: np.ndarray, arg: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    # Index of the minimum of v[lo..hi] (inclusive) for each query
+    k = np.floor(np.log2(hi - lo + 1)).astype(int)
+    a, b = arg[k, lo], arg[k, hi - (1 << k) + 1]
+    return np.where(v[b] < v[a], b, a)
+
+def _first_at_or_above(v: np.ndarray, mx: np.ndarray, start: np.ndarray, level: np.ndarray) -> np.ndarray:
+    # First index j >= start with v[j] >= level (len(v) if none): skip the largest power-of-two blocks whose
+    # max stays below the level, from the biggest block down
+    n, pos = len(v), start.copy()
+    for k in range(mx.shape[0] - 1, -1, -1):
+        step = 1 << k
+        skip = (pos + step <= n) & (mx[k, np.minimum(pos, n - 1)] < level)
+        pos = np.where(skip, pos + step, pos)
+    return np.where((pos < n) & (v[np.minimum(pos, n - 1)] >= level), pos, n)
+
+def event_bounds(index: pd.DatetimeIndex, events: list) -> tuple:
+    # First bar on/after each start and last bar on/before each end; `ok` drops events outside the data
+    starts = pd.DatetimeIndex([pd.Timestamp(ev["start"]) for ev in events]).values.astype(index.values.dtype)
+    ends = pd.DatetimeIndex([pd.Timestamp(ev["end"]) for ev in events]).values.astype(index.values.dtype)
+    s = np.searchsorted(index.values, starts, side="left")
+    e = np.searchsorted(index.values, ends, side="right") - 1
+    return s, e, (s < len(index)) & (e > s) & (starts >= index.values[0] if len(index) else False)
+
+COLUMNS = ["Event", "Asset", "Start", "End", "Return_%", "Max_DD_%", "Trough", "Days_To_Trough", "Days_To_Recovery"]
+
+def _event_stats(close: pd.Series, events: list) -> dict | None:
+    close = close.dropna()
+    if close.empty or not events: return None
+    v, dates = close.to_numpy(dtype=float), close.index.values.astype("datetime64[D]")
+    s, e, ok = event_bounds(close.index, events)
+    s, e = s[ok], e[ok]
+    if len(s) == 0: return None
+
+    arg, mx = _sparse_tables(v)
+    base = v[s]
+    trough = _range_argmin(v, arg, s, e)
+    # Recovery: first bar after the trough back at the event-start level, even if that is after the event ended
+    rec = _first_at_or_above(v, mx, trough + 1, base)
+    days = lambda a, b: (dates[a] - dates[b]).astype(int).astype(float)
+    return {
+        "Event": np.array([ev["name"] for ev in events], dtype=object)[ok], "Start": dates[s], "End": dates[e],
+        "Return_%": (v[e] / base - 1) * 100,
+        "Max_DD_%": np.minimum(v[trough] / base - 1, 0) * 100,
+        "Trough": dates[trough],
+        "Days_To_Trough": days(trough, s),
+        "Days_To_Recovery": np.where(v[trough] >= base, 0.0, np.where(rec < len(v), days(np.minimum(rec, len(v) - 1), trough), np.nan))
+    }
+
+def event_study(closes: dict, events: list) -> pd.DataFrame:
+    # Per (event, asset) return, drawdown from the event-start level, days to trough, and days from the
+    # trough back to the start level (NaN = not recovered yet). Columns are concatenated as arrays and
+    # framed once, so hundreds of assets cost one DataFrame build.
+    parts = [(name, st) for name, c in closes.items() if (st := _event_stats(c, events)) is not None]
+    if not parts: return pd.DataFrame(columns=COLUMNS)
+    cols = {c: np.concatenate([st[c] for _, st in parts]) for c in COLUMNS if c != "Asset"}
+    cols["Asset"] = np.repeat(np.array([name for name, _ in parts], dtype=object), [len(st["Event"]) for _, st in parts])
+    return pd.DataFrame(cols)[COLUMNS]
+
+def event_paths(close: pd.Series, events: list, horizon_days: int = 365) -> dict:
+    # {event name: (days since start, % change from the start bar)} over a common horizon, for overlays
+    close = close.dropna()
+    if close.empty or not events: return {}
+    v, dates = close.to_numpy(dtype=float), close.index.values.astype("datetime64[D]")
+    s, _, ok = event_bounds(close.index, events)
+    s = s[ok]
+    stop = np.searchsorted(dates, dates[s] + np.timedelta64(horizon_days, "D"), side="right")
+    lengths = stop - s
+    # One gather for every event: concatenated aranges via repeat + running offsets
+    idx = np.repeat(s - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+    owner = np.repeat(np.arange(len(s)), lengths)
+    x, y = (dates[idx] - dates[s][owner]).astype(int), (v[idx] / v[s][owner] - 1) * 100
+    bounds = np.r_[0, np.cumsum(lengths)]
+    names = [ev["name"] for ev, keep in zip(events, ok) if keep]
+    return {name: (x[bounds[i]:bounds[i + 1]], y[bounds[i]:bounds[i + 1]]) for i, name in enumerate(names)}
+
+def parse_events(text: str) -> tuple:
+    # "Name, YYYY-MM-DD[, YYYY-MM-DD]" per line; a missing end means still ongoing
+    events, errors = [], []
+    for line in text.splitlines():
+        parts = [p.strip() for p in line.split(",")]
+        if not parts[0]: continue
+        try:
+            start = pd.Timestamp(parts[1])
+            end = pd.Timestamp(parts[2]) if len(parts) > 2 and parts[2] else pd.Timestamp.today().normalize()
+            if end <= start: raise ValueError("end before start")
+            events.append({"start": start.strftime("%Y-%m-%d"), "end": end.strftime("%Y-%m-%d"), "name": parts[0]})
+        except (IndexError, ValueError) as e:
+            errors.append(f"{line.strip()} ({e if isinstance(e, ValueError) else 'missing start date'})")
+    return events, errors
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+@dataclass
+class FetchReport:
+    results: dict = field(default_factory=dict)
+    failures: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    attempts: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def summary(self) -> str:
+        slowest = max(self.timings, key=self.timings.get) if self.timings else "-"
+        return (f"{len(self.results)} ok, {len(self.failures)} failed, "
+                f"slowest {slowest} ({self.timings.get(slowest, 0):.2f}s)")
+
+def _run_one(key: str, fn: Callable, retries: int, backoff: float, sleep: Callable) -> tuple:
+    t0, err = time.perf_counter(), None
+    for attempt in range(1, retries + 1):
+        try:
+            return key, fn(key), None, time.perf_counter() - t0, attempt
+        except Exception as e:
+            err = e
+            # Exponential backoff between attempts: backoff, 2*backoff, 4*backoff...
+            if attempt < retries: sleep(backoff * 2 ** (attempt - 1))
+    return key, None, f"{type(err).__name__}: {err}", time.perf_counter() - t0, retries
+
+def fetch_many(keys: list, fn: Callable, max_workers: int = 8, retries: int = 3, backoff: float = 0.5, sleep: Callable = time.sleep) -> FetchReport:
+    # Runs fn(key) for every key on a bounded thread pool. A failing key is retried with backoff and,
+    # if it never succeeds, reported in .failures instead of aborting the other keys.
+    report, keys = FetchReport(), list(dict.fromkeys(keys))
+    if not keys: return report
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as pool:
+        for key, res, err, elapsed, attempts in pool.map(lambda k: _run_one(k, fn, retries, backoff, sleep), keys):
+            report.timings[key], report.attempts[key] = elapsed, attempts
+            if err is None: report.results[key] = res
+            else: report.failures[key] = err
+    return report
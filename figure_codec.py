@@ -0,0 +1,135 @@
+import base64
+import json
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from config import CHART_WIDTH_PX, FIGURE_PRECISION
+from telemetry import timed
+
+# What actually goes to the browser. Built figures are compacted once and serialized to plotly JSON, and
+# that string is what gets cached and shipped:
+#   * long line traces are cut to about one point per horizontal pixel with LTTB, which keeps the peaks and
+#     troughs a plain stride would drop
+#   * values (y, error bars, marker sizes...) are rounded to a fixed number of decimals; coordinates (x,
+#     customdata) keep full precision, since rounding a dense axis would reorder its points
+#   * arrays are packed as base64 typed arrays in the narrowest dtype that holds them (i1/i2/i4 for whole
+#     numbers, else f4 or f8)
+#   * midnight timestamps ship as "YYYY-MM-DD" instead of full ISO datetimes
+#   * the layout template keeps only the trace-type defaults the figure actually uses
+# SerializedFigure hands that string to st.plotly_chart, so a rerun neither validates nor deep-copies a
+# figure tree; it only parses the cached JSON back for Streamlit's own serializer.
+
+_INT_TYPES = [("i1", np.int8), ("i2", np.int16), ("i4", np.int32)]
+_VALUE_KEYS = {"y", "z", "array", "arrayminus", "size", "opacity"}
+_ARRAY_KEYS = _VALUE_KEYS | {"x", "customdata"}
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: indices of n_out points (first and last always kept). Each bucket keeps
+    # the point forming the largest triangle with the previous pick and the next bucket's mean.
+    n = len(y)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    # Next-bucket means for every bucket up front; the last bucket looks ahead to the final point
+    sums_x, sums_y = np.add.reduceat(x[1:n - 1], edges[:-1] - 1), np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x, mean_y = np.append(sums_x[1:] / counts[1:], x[-1]), np.append(sums_y[1:] / counts[1:], y[-1])
+    out, a = np.empty(n_out, dtype=int), 0
+    out[0], out[-1] = 0, n - 1
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - mean_x[i]) * (by - y[a]) - (x[a] - bx) * (mean_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+def downsample_xy(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple:
+    # LTTB per NaN-separated segment (nan_separated traces hold one line per segment, each spanning the
+    # full width), then re-joined with the NaN breaks
+    gap = np.isnan(y)
+    if not gap.any():
+        keep = lttb(x, y, n_out)
+        return x[keep], y[keep]
+    bounds = np.flatnonzero(np.diff(np.r_[True, gap, True].astype(int)))
+    keep = []
+    for lo, hi in zip(bounds[::2], bounds[1::2]):
+        keep.append(lo + lttb(x[lo:hi], y[lo:hi], n_out))
+        if hi < len(y): keep.append(np.array([hi]))
+    keep = np.concatenate(keep) if keep else np.array([], dtype=int)
+    return x[keep], y[keep]
+
+def _decode(v):
+    # Plotly keeps numpy-backed data as {"dtype", "bdata"} specs; anything else array-like comes back as an ndarray
+    if isinstance(v, dict) and "bdata" in v:
+        a = np.frombuffer(base64.b64decode(v["bdata"]), dtype=np.dtype(v["dtype"]))
+        return a.reshape(v["shape"]) if "shape" in v else a
+    if isinstance(v, (list, tuple)) and v and all(isinstance(e, (int, float)) and not isinstance(e, bool) for e in v):
+        return np.asarray(v, dtype=float)
+    return v if isinstance(v, np.ndarray) else None
+
+def encode_array(a: np.ndarray, precision: int | None = FIGURE_PRECISION):
+    # precision=None keeps every value exact (whole numbers still get the narrow integer types)
+    if a.dtype.kind == "M":
+        day = a.astype("datetime64[D]")
+        return np.datetime_as_string(day if (a == day).all() else a.astype("datetime64[s]")).tolist()
+    if a.dtype.kind not in "biuf": return a.tolist()
+    a = a.astype(float) if precision is None else np.round(a.astype(float), precision)
+    finite = a[np.isfinite(a)]
+    peak = np.abs(finite).max() if finite.size else 0.0
+    if finite.size == a.size and np.all(finite == np.round(finite)):
+        code, dt = next(((c, t) for c, t in _INT_TYPES if peak <= np.iinfo(t).max), ("f8", np.float64))
+    elif precision is None:
+        code, dt = "f8", np.float64
+    else:
+        # float32 carries ~7 significant digits: enough while the rounding step is still representable
+        code, dt = ("f4", np.float32) if peak * 10 ** precision < 2 ** 24 else ("f8", np.float64)
+    return {"dtype": code, "bdata": base64.b64encode(np.ascontiguousarray(a, dtype=dt).tobytes()).decode("ascii")}
+
+def _compact(node: dict, precision: int) -> dict:
+    out = {}
+    for k, v in node.items():
+        if isinstance(v, dict) and "bdata" not in v: out[k] = _compact(v, precision); continue
+        arr = _decode(v) if k in _ARRAY_KEYS else None
+        out[k] = encode_array(arr, precision if k in _VALUE_KEYS else None) if arr is not None and arr.ndim >= 1 and arr.size > 1 else v
+    return out
+
+def _is_array(v) -> bool:
+    return (isinstance(v, dict) and "bdata" in v) or isinstance(v, (list, tuple, np.ndarray))
+
+def _line_only(trace: dict) -> bool:
+    # Safe to thin: a plain line with no per-point markers, text, colors or widths that would fall out of step
+    if trace.get("type", "scatter") not in ("scatter", "scattergl") or "markers" in trace.get("mode", "lines"): return False
+    return not any(_is_array(v) for k, v in trace.items() if k not in ("x", "y")) and not any(_is_array(v) for v in trace.get("line", {}).values())
+
+class SerializedFigure(go.Figure):
+    # An empty go.Figure carrying a compact_figure spec. st.plotly_chart reads figures through to_dict(),
+    # which here parses the cached JSON instead of copying a validated figure tree.
+    def __init__(self, spec: str):
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self) -> dict:
+        return json.loads(self._spec)
+
+    def to_json(self, *args, **kwargs) -> str:
+        return self._spec
+
+@timed("figure")
+def compact_figure(fig: go.Figure, width_px: int = CHART_WIDTH_PX, precision: int = FIGURE_PRECISION) -> str:
+    spec = fig.to_plotly_json()
+    data = []
+    for trace in spec["data"]:
+        trace = dict(trace)
+        x, y = _decode(trace.get("x")), _decode(trace.get("y"))
+        if x is not None and y is not None and len(y) > width_px and len(x) == len(y) and x.dtype.kind in "Miuf" and _line_only(trace):
+            xs = x.astype("int64") if x.dtype.kind == "M" else x.astype(float)
+            thin_x, thin_y = downsample_xy(xs, y.astype(float), width_px)
+            trace["x"], trace["y"] = thin_x.astype(x.dtype) if x.dtype.kind == "M" else thin_x, thin_y
+        data.append(_compact(trace, precision))
+    layout = dict(spec["layout"])
+    template = layout.get("template")
+    if isinstance(template, dict):
+        types = {t.get("type", "scatter") for t in data}
+        layout["template"] = {**template, "data": {k: v for k, v in template.get("data", {}).items() if k in types}}
+    return pio.to_json({"data": data, "layout": layout}, validate=False)
@@ -0,0 +1,97 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import telemetry
+
+def _feed(h, obj, known: dict):
+    # Results produced by the cache are identified by the key that produced them, so chained
+    # steps (frame -> stats dict -> figure) never re-hash a large intermediate.
+    tag = known.get(id(obj))
+    if tag is not None and tag[0] is obj:
+        h.update(b"K" + tag[1].encode()); return
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(b"P" + repr((type(obj).__name__, obj.shape, getattr(obj, "name", None), list(getattr(obj, "columns", [])))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(b"A" + repr((obj.shape, obj.dtype.str)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"D%d" % len(obj))
+        for k in sorted(obj, key=repr):
+            _feed(h, k, known); _feed(h, obj[k], known)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"L%d" % len(obj))
+        for v in obj: _feed(h, v, known)
+    elif obj is None or isinstance(obj, (str, bytes, int, float, bool, np.generic)):
+        h.update(b"S" + repr(obj).encode())
+    else:
+        h.update(b"O" + pickle.dumps(obj))
+
+def fingerprint(obj, known: dict | None = None) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, obj, known or {})
+    return h.hexdigest()
+
+class MemoCache:
+    # Bounded LRU for derived results and built figures, keyed on (function, fingerprint of its inputs).
+    # Only calls whose inputs actually changed are recomputed.
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries, self._known = OrderedDict(), {}
+        self._lock = threading.RLock()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self.by_name = {}
+
+    def _count(self, name: str, field: str):
+        stats = self.by_name.setdefault(name, {"hits": 0, "misses": 0})
+        stats[field] += 1
+
+    def key(self, name: str, *args, **kwargs) -> str:
+        with self._lock:
+            return name + ":" + fingerprint((args, kwargs), self._known)
+
+    def call(self, fn, *args, **kwargs):
+        name = getattr(fn, "__qualname__", repr(fn))
+        key = self.key(name, *args, **kwargs)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1; self._count(name, "hits")
+                telemetry.count("memo.hit")
+                return self._entries[key]
+        telemetry.count("memo.miss")
+        value = fn(*args, **kwargs)
+        with self._lock:
+            self.misses += 1; self._count(name, "misses")
+            self._entries[key] = value
+            if not isinstance(value, (type(None), str, bytes, int, float, bool, tuple, np.generic)):
+                self._known[id(value)] = (value, key)
+            while len(self._entries) > self.maxsize:
+                _, old = self._entries.popitem(last=False)
+                self._known.pop(id(old), None)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear(); self._known.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / total if total else 0.0,
+                "by_function": {k: dict(v) for k, v in self.by_name.items()}
+            }
+
+_memo = None
+
+def get_memo_cache() -> MemoCache:
+    # Module state survives Streamlit reruns, so one cache serves every session in the process
+    global _memo
+    if _memo is None: _memo = MemoCache()
+    return _memo
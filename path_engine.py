@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+def cumulative_paths(roc, periods: list | None = None) -> np.ndarray:
+    # Compounds % returns along the last axis for every row at once. Output has a leading 0 anchor column;
+    # a missing period carries the previous level forward (same as the old per-series _cum loop).
+    if isinstance(roc, (pd.DataFrame, pd.Series)):
+        roc = (roc.reindex(columns=periods) if isinstance(roc, pd.DataFrame) else roc.reindex(periods)) if periods is not None else roc
+        roc = roc.to_numpy(dtype=float)
+    roc = np.atleast_1d(np.asarray(roc, dtype=float))
+    growth = np.cumprod(1 + np.nan_to_num(roc) / 100, axis=-1)
+    return np.concatenate([np.zeros(roc.shape[:-1] + (1,)), (growth - 1) * 100], axis=-1)
+
+def nan_separated(x: list, paths: np.ndarray) -> tuple:
+    # Flattens a (rows x len(x)) matrix into one x/y pair with NaN breaks, so N lines ship as a single trace
+    rows = paths.shape[0]
+    xs = np.tile(np.append(np.asarray(x, dtype=float), np.nan), rows)
+    ys = np.hstack([paths, np.full((rows, 1), np.nan)]).ravel()
+    return xs, ys
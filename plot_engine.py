@@ -1,7 +1,9 @@
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-from config import COLORS, PLOTLY_TEMPLATE, CURRENT_YEAR
+from config import COLORS, PLOTLY_TEMPLATE, CURRENT_YEAR, TIMEFRAMES
+from path_engine import cumulative_paths, nan_separated
+from telemetry import timed
 
 def _base_layout(title: str, height: int = 380) -> dict:
     return dict(
@@ -13,13 +15,38 @@ def _base_layout(title: str, height: int = 380) -> dict:
         legend=dict(bgcolor="rgba(0,0,0,0)", orientation="h", y=1.08, x=0), hovermode="x unified"
     )
 
-def make_bar_chart(data: dict, window_key: str, show_winrate: bool, timeframe: str, title: str) -> go.Figure:
+def _period_axis(timeframe: str, start: float) -> dict:
+    label, n = TIMEFRAMES[timeframe]
+    # Trading days are ticked by month (~21 sessions) rather than one tick per period
+    return dict(title=label, dtick=1 if n <= 52 else 21, range=[start, n + 0.5])
+
+def figure_payload_bytes(fig: go.Figure | str) -> int:
+    return len((fig if isinstance(fig, str) else fig.to_json()).encode("utf-8"))
+
+@timed("figure")
+def make_bar_chart(data: dict, window_key: str, show_winrate: bool, timeframe: str, title: str, sig: dict | None = None) -> go.Figure:
     avg, wr, cur, periods, cur_p = data[f"avg_{window_key}"], data[f"wr_{window_key}"], data["cur_roc"], data["periods"], data["current_period"]
-    bar_colors = [COLORS["pos_bar"] if v >= 0 else COLORS["neg_bar"] for v in avg.reindex(periods).fillna(0)]
+    y = avg.reindex(periods).to_numpy(dtype=float)
+    bar_colors = [COLORS["pos_bar"] if v >= 0 else COLORS["neg_bar"] for v in np.nan_to_num(y)]
     wr_text = [f"{wr.get(p, np.nan):.0f}%" if show_winrate and not pd.isna(wr.get(p, np.nan)) else "" for p in periods]
+    # Too many bars for labels on a daily axis: the win rate moves into the hover text
+    dense = len(periods) > 52
+    hover = [[f"Win rate {t}"] if dense and t else [] for t in wr_text]
+    bar = dict(marker_color=bar_colors)
+
+    if sig is not None:
+        # Bootstrap CI as error bars; bars that don't clear the significance level are faded, win rates that do get a '*'
+        lo, hi = (sig[f"avg_{window_key}_{s}"].reindex(periods).to_numpy() for s in ("lo", "hi"))
+        p_avg, p_wr = (sig[f"p_{s}_{window_key}"].reindex(periods).to_numpy() for s in ("avg", "wr"))
+        alpha = 1 - sig["confidence"]
+        bar["error_y"] = dict(type="data", symmetric=False, array=hi - y, arrayminus=y - lo, color=COLORS["text_annot"], thickness=1, width=0 if dense else 3)
+        bar["marker_opacity"] = np.where(p_avg < alpha, 1.0, 0.45).tolist()
+        wr_text = [t + "*" if t and pw < alpha else t for t, pw in zip(wr_text, p_wr)]
+        for h, l, u, pa, pw in zip(hover, lo, hi, p_avg, p_wr):
+            if not np.isnan(pa): h.append(f"{sig['confidence']:.0%} CI {l:+.2f}% … {u:+.2f}%<br>p(avg) {pa:.3f} · p(win rate) {pw:.3f}")
 
     fig = go.Figure()
-    fig.add_trace(go.Bar(x=periods, y=avg.reindex(periods).values, text=wr_text, textposition='outside', marker_color=bar_colors, name="Hist. Avg"))
+    fig.add_trace(go.Bar(x=periods, y=y, text=None if dense else wr_text, hovertext=["<br>".join(h) for h in hover] if any(hover) else None, textposition='outside', name="Hist. Avg", **bar))
     cur_x = [p for p in periods if p in cur.index]
     if cur_x:
         fig.add_trace(go.Scatter(x=cur_x, y=[cur[p] for p in cur_x], mode="lines+markers", line=dict(color=COLORS["cur_year_bar"], width=2), marker=dict(size=7, color="#FFFFFF", line=dict(color="#000000", width=1.5)), name=f"{CURRENT_YEAR} Actual"))
@@ -27,58 +54,62 @@ def make_bar_chart(data: dict, window_key: str, show_winrate: bool, timeframe: s
     if cur_p in periods: fig.add_vline(x=cur_p, line_dash="dash", line_color=COLORS["vline"])
     
     layout = _base_layout(title)
-    layout["xaxis"].update(title="Week" if timeframe == "Weekly" else "Month", dtick=1, range=[0.5, (52 if timeframe=="Weekly" else 12) + 0.5])
+    layout["xaxis"].update(**_period_axis(timeframe, 0.5))
     layout["yaxis"]["ticksuffix"] = "%"
     fig.update_layout(**layout)
     return fig
 
-def make_cumulative_chart(data: dict, window_key: str, show_spaghetti: bool, timeframe: str, title: str) -> go.Figure:
+@timed("figure")
+def make_cumulative_chart(data: dict, window_key: str, show_spaghetti: bool, timeframe: str, title: str, webgl: bool = False) -> go.Figure:
     avg, cur, pivot, periods, cur_p = data[f"avg_{window_key}"], data["cur_roc"], data["pivot"], data["periods"], data["current_period"]
-    
-    def _cum(s):
-        c, r = [0.0], 100.0
-        for p in periods:
-            v = s.get(p, np.nan)
-            if pd.isna(v): c.append(c[-1])
-            else: r *= (1 + v/100); c.append(r - 100.0)
-        return c
         
     fig, x_anchor = go.Figure(), [0] + periods
     if show_spaghetti:
         yrs = sorted(pivot.index.tolist())[-5:] if window_key == "5" else (sorted(pivot.index.tolist())[-10:] if window_key == "10" else sorted(pivot.index.tolist()))
-        for i, yr in enumerate(yrs):
-            fig.add_trace(go.Scatter(x=x_anchor, y=_cum(pivot.loc[yr] if yr in pivot.index else pd.Series(dtype=float)), mode="lines", line=dict(color=COLORS["spaghetti"]), showlegend=(i==0), name="Past Years" if i==0 else None))
+        if yrs:
+            # Every past year in one NaN-separated trace instead of one trace per year
+            xs, ys = nan_separated(x_anchor, cumulative_paths(pivot.loc[yrs], periods))
+            scatter = go.Scattergl if webgl else go.Scatter
+            fig.add_trace(scatter(x=xs, y=ys, mode="lines", line=dict(color=COLORS["spaghetti"]), name="Past Years", hoverinfo="skip"))
             
-    fig.add_trace(go.Scatter(x=x_anchor, y=_cum(avg), mode="lines", line=dict(color=COLORS["avg_line"], width=3.5), name="Hist. Avg"))
+    fig.add_trace(go.Scatter(x=x_anchor, y=cumulative_paths(avg, periods), mode="lines", line=dict(color=COLORS["avg_line"], width=3.5), name="Hist. Avg"))
     cur_x = [p for p in periods if p in cur.index]
     if cur_x:
-        fig.add_trace(go.Scatter(x=x_anchor[:len(cur_x)+1], y=_cum(pd.Series({p: cur.get(p, np.nan) for p in periods}))[:len(cur_x)+1], mode="lines+markers", line=dict(color=COLORS["cur_year"], width=3), name=f"{CURRENT_YEAR} Actual"))
+        fig.add_trace(go.Scatter(x=x_anchor[:len(cur_x)+1], y=cumulative_paths(cur, periods)[:len(cur_x)+1], mode="lines+markers", line=dict(color=COLORS["cur_year"], width=3), name=f"{CURRENT_YEAR} Actual"))
 
     if cur_p in x_anchor: fig.add_vline(x=cur_p, line_dash="dash", line_color=COLORS["vline"])
     
     layout = _base_layout(title)
-    layout["xaxis"].update(title="Week" if timeframe == "Weekly" else "Month", dtick=1, range=[-0.5, (52 if timeframe=="Weekly" else 12) + 0.5])
+    layout["xaxis"].update(**_period_axis(timeframe, -0.5))
     layout["yaxis"]["ticksuffix"] = "%"
     fig.update_layout(**layout)
     return fig
 
+@timed("figure")
+def make_backtest_chart(bt: dict, title: str) -> go.Figure:
+    x, fig = bt["timeline"], go.Figure()
+    # Per-ticker strategy curves as one NaN-separated background trace
+    xs, ys = nan_separated(x, (bt["equity"] - 1) * 100)
+    fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines", line=dict(color=COLORS["spaghetti"], width=1), name="Tickers", hoverinfo="skip"))
+    fig.add_trace(go.Scatter(x=x, y=(bt["portfolio_bh"] - 1) * 100, mode="lines", line=dict(color=COLORS["neg_bar"], width=2, dash="dot"), name="Buy & Hold (EW)"))
+    fig.add_trace(go.Scatter(x=x, y=(bt["portfolio"] - 1) * 100, mode="lines", line=dict(color=COLORS["avg_line"], width=3), name="Seasonal Strategy (EW)"))
+
+    layout = _base_layout(title, height=450)
+    layout["xaxis"].update(title="Year")
+    layout["yaxis"].update(ticksuffix="%", title="Cumulative Return")
+    fig.update_layout(**layout)
+    return fig
+
+@timed("figure")
 def make_presidential_cycle_chart(cycle_data: dict) -> go.Figure:
     avg_roc, cur_roc, start_yr = cycle_data["avg_roc"], cycle_data["cur_roc"], cycle_data["current_cycle_start"]
     periods, x_anchor = list(range(1, 49)), [0] + list(range(1, 49))
-    
-    def _cum(s):
-        c, r = [0.0], 100.0
-        for p in periods:
-            v = s.get(p, np.nan)
-            if pd.isna(v): c.append(c[-1])
-            else: r *= (1 + v/100); c.append(r - 100.0)
-        return c
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x_anchor, y=_cum(avg_roc), mode="lines", line=dict(color=COLORS["avg_line"], width=3.5), name="Hist. Avg"))
+    fig.add_trace(go.Scatter(x=x_anchor, y=cumulative_paths(avg_roc, periods), mode="lines", line=dict(color=COLORS["avg_line"], width=3.5), name="Hist. Avg"))
     if [p for p in periods if p in cur_roc.index]:
         n = len([p for p in periods if p in cur_roc.index]) + 1
-        fig.add_trace(go.Scatter(x=x_anchor[:n], y=_cum(pd.Series({p: cur_roc.get(p, np.nan) for p in periods}))[:n], mode="lines+markers", line=dict(color=COLORS["cur_year"], width=3.5), name=f"Current ({start_yr})"))
+        fig.add_trace(go.Scatter(x=x_anchor[:n], y=cumulative_paths(cur_roc, periods)[:n], mode="lines+markers", line=dict(color=COLORS["cur_year"], width=3.5), name=f"Current ({start_yr})"))
 
     for m, label in [(12, "Yr 1"), (24, "Yr 2"), (36, "Yr 3")]: fig.add_vline(x=m, line_dash="dot", line_color="#4a5568")
 
@@ -88,23 +119,52 @@ def make_presidential_cycle_chart(cycle_data: dict) -> go.Figure:
     fig.update_layout(**layout)
     return fig
 
-def make_rebased_macro_chart(data_dict: dict, events_list: list, zone_color: str, title: str) -> go.Figure:
+@timed("figure")
+def make_rebased_macro_chart(df_rebased: pd.DataFrame, events_list: list, zone_color: str, title: str) -> go.Figure:
+    # df_rebased: data_engine.rebase_macro output, so several charts can share one rebased frame
     fig = go.Figure()
-    df_combined = pd.DataFrame(data_dict).dropna()
-    if df_combined.empty: return fig
-    df_rebased = df_combined / df_combined.iloc[0] * 100
+    if df_rebased.empty: return fig
     
     for col in df_rebased.columns:
         fig.add_trace(go.Scatter(x=df_rebased.index, y=df_rebased[col], mode="lines", line=dict(color=COLORS.get(col.split(" ")[0].lower(), "#FFFFFF"), width=2), name=col))
 
-    for ev in events_list:
-        fig.add_vrect(x0=ev["start"], x1=ev["end"], fillcolor=zone_color, opacity=0.8, line_width=0, annotation_text=ev["name"], annotation_position="top left", annotation_textangle=-90)
-
     layout = _base_layout(title, height=450)
+    # All event zones and labels go in with the layout in one pass instead of one add_vrect relayout per event
+    layout["shapes"] = [dict(type="rect", xref="x", yref="y domain", x0=ev["start"], x1=ev["end"], y0=0, y1=1, fillcolor=zone_color, opacity=0.8, line_width=0) for ev in events_list]
+    layout["annotations"] = [dict(x=ev["start"], y=1, xref="x", yref="y domain", text=ev["name"], showarrow=False, textangle=-90, xanchor="left", yanchor="top") for ev in events_list]
     layout["yaxis"].update(type="log", title="Index/Asset Value (Log)")
     fig.update_layout(**layout)
     return fig
 
+@timed("figure")
+def make_event_overlay_chart(paths: dict, title: str) -> go.Figure:
+    # One line per event, aligned on calendar days since the event started
+    fig = go.Figure()
+    fig.add_hline(y=0, line_color=COLORS["border"])
+    for name, (x, y) in paths.items():
+        fig.add_trace(go.Scatter(x=x, y=y, mode="lines", line=dict(width=2), name=name, hovertemplate=f"<b>{name}</b><br>Day %{{x}}: %{{y:+.1f}}%<extra></extra>"))
+    layout = _base_layout(title, height=450)
+    layout["xaxis"].update(title="Days Since Event Start")
+    layout["yaxis"].update(ticksuffix="%", title="Change From Event Start")
+    layout["hovermode"] = "closest"
+    fig.update_layout(**layout)
+    return fig
+
+@timed("figure")
+def make_similarity_chart(profiles: dict, title: str, x_title: str) -> go.Figure:
+    # {label: standardized profile}; the first entry is the query and is drawn on top
+    fig = go.Figure()
+    for i, (name, y) in enumerate(list(profiles.items())[::-1]):
+        query = i == len(profiles) - 1
+        fig.add_trace(go.Scatter(x=np.arange(1, len(y) + 1), y=y, mode="lines", name=name,
+                                 line=dict(color=COLORS["avg_line"], width=3.5) if query else dict(width=1.5), opacity=1 if query else 0.7))
+    layout = _base_layout(title, height=450)
+    layout["xaxis"].update(title=x_title)
+    layout["yaxis"].update(title="Avg Return (z-score)")
+    fig.update_layout(**layout)
+    return fig
+
+@timed("figure")
 def make_rrg_chart(rrg_data: dict) -> go.Figure:
     from config import SECTOR_COLORS
     fig = go.Figure()
@@ -0,0 +1,205 @@
+import os
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from config import DATA_DIR, STORE_REFRESH_SECONDS
+from providers import OHLCV, DataProvider, default_provider
+from shared_cache import file_lock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL, date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, date)
+);
+-- Covers the close-only scan that repacks a series after each write
+CREATE INDEX IF NOT EXISTS bars_close ON bars (ticker, interval, date, close);
+-- Each series' dates (int64 day numbers) and closes (float64) packed into one row, rebuilt on every write:
+-- reading a whole series decodes one row instead of one per bar
+CREATE TABLE IF NOT EXISTS closes (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL, dates BLOB NOT NULL, close BLOB NOT NULL,
+    PRIMARY KEY (ticker, interval)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL, start TEXT, updated REAL NOT NULL,
+    PRIMARY KEY (ticker, interval)
+);
+"""
+_COLS = [c.lower() for c in OHLCV]
+
+# A re-fetched bar whose close moved by more than this (relative) means the provider rescaled history
+RESCALE_TOLERANCE = 1e-4
+
+def store_path(provider: DataProvider) -> str:
+    # Yahoo bars live in the shared prices.sqlite; every offline provider gets its own file so fixture or
+    # synthetic bars never end up in the history the live dashboard reads and appends to
+    key = provider.store_key
+    return os.path.join(DATA_DIR, "prices.sqlite" if key == "yahoo" else f"prices-{key}.sqlite")
+
+class PriceStore:
+    # SQLite-backed bar store keyed by (ticker, interval), one file per provider. Safe to share between
+    # processes: WAL mode lets readers proceed while one writer appends.
+    def __init__(self, path: str | None = None, provider: DataProvider | None = None, refresh_seconds: float = STORE_REFRESH_SECONDS):
+        self.provider = provider or default_provider()
+        self.path = path or store_path(self.provider)
+        self.refresh_seconds = refresh_seconds
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60)
+
+    def meta(self, ticker: str, interval: str) -> tuple[str | None, float] | None:
+        with self._connect() as con:
+            return con.execute("SELECT start, updated FROM meta WHERE ticker=? AND interval=?", (ticker, interval)).fetchone()
+
+    def last_date(self, ticker: str, interval: str) -> pd.Timestamp | None:
+        with self._connect() as con:
+            row = con.execute("SELECT MAX(date) FROM bars WHERE ticker=? AND interval=?", (ticker, interval)).fetchone()
+        return pd.Timestamp(row[0]) if row and row[0] else None
+
+    def settled_bar(self, ticker: str, interval: str) -> tuple[pd.Timestamp, float] | None:
+        # Second-newest stored bar: the newest may have been written while its week/month/session was still forming
+        with self._connect() as con:
+            rows = con.execute("SELECT date, close FROM bars WHERE ticker=? AND interval=? ORDER BY date DESC LIMIT 2", (ticker, interval)).fetchall()
+        return (pd.Timestamp(rows[-1][0]), rows[-1][1]) if len(rows) == 2 else None
+
+    def needs_update(self, ticker: str, interval: str, start: str | None = None) -> bool:
+        m = self.meta(ticker, interval)
+        if m is None or not _covers(m[0], start): return True
+        return time.time() - m[1] > self.refresh_seconds
+
+    def write(self, ticker: str, interval: str, df: pd.DataFrame, start: str | None, replace: bool = False):
+        rows = []
+        if df is not None and not df.empty:
+            frame = df.reindex(columns=OHLCV)
+            frame = frame.astype(float).where(frame.notna(), None)
+            dates = frame.index.strftime("%Y-%m-%d")
+            rows = [(ticker, interval, d, *vals) for d, vals in zip(dates, frame.itertuples(index=False, name=None))]
+        with self._connect() as con:
+            if replace: con.execute("DELETE FROM bars WHERE ticker=? AND interval=?", (ticker, interval))
+            con.executemany(f"INSERT OR REPLACE INTO bars (ticker, interval, date, {', '.join(_COLS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            _pack_closes(con, ticker, interval)
+            con.execute("INSERT OR REPLACE INTO meta (ticker, interval, start, updated) VALUES (?, ?, ?, ?)", (ticker, interval, start, time.time()))
+
+    def update(self, ticker: str, interval: str, start: str | None = None):
+        m = self.meta(ticker, interval)
+        last = self.last_date(ticker, interval)
+        if m is None or last is None or not _covers(m[0], start):
+            # Nothing usable on disk (or the request reaches further back): pull the whole range once
+            self.write(ticker, interval, _full_history(self.provider, ticker, start, interval), start, replace=True)
+        else:
+            # Re-fetch from the bar before the last one: the last gets its final close, and the settled one
+            # tells us whether the provider has rescaled history since (splits are adjusted backwards in time)
+            settled = self.settled_bar(ticker, interval)
+            since = settled[0] if settled else last
+            df = self.provider.history(ticker, since.strftime("%Y-%m-%d"), interval)
+            if settled and _rescaled(df, *settled):
+                print(f"History of {ticker} ({interval}) was rescaled by the provider, reloading it")
+                self.write(ticker, interval, _full_history(self.provider, ticker, m[0], interval), m[0], replace=True)
+            else:
+                self.write(ticker, interval, df, m[0])
+
+    def read(self, ticker: str, interval: str, start: str | None = None) -> pd.DataFrame:
+        sql = f"SELECT date, {', '.join(_COLS)} FROM bars WHERE ticker=? AND interval=?"
+        params = [ticker, interval]
+        if start:
+            sql += " AND date >= ?"
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        with self._connect() as con:
+            df = pd.read_sql_query(sql + " ORDER BY date", con, params=params, index_col="date")
+        df.index = pd.to_datetime(df.index).rename("Date")
+        df.columns = OHLCV
+        return df
+
+    def _lock_path(self, ticker: str, interval: str) -> str:
+        safe = "".join(c if c.isalnum() else "_" for c in ticker)
+        return os.path.join(os.path.dirname(self.path), "locks", f"{safe}_{interval}.lock")
+
+    def read_close(self, ticker: str, interval: str, start: str | None = None) -> pd.Series:
+        return self.read_closes([ticker], interval, start).get(ticker, _unpack(ticker, b"", b"", start))
+
+    def read_closes(self, tickers: list, interval: str, start: str | None = None) -> dict:
+        # {ticker: close series} from the packed rows, a few hundred tickers per query. Tickers with no bars
+        # are left out.
+        out, tickers = {}, list(dict.fromkeys(tickers))
+        with self._connect() as con:
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                sql = f"SELECT ticker, dates, close FROM closes WHERE interval=? AND ticker IN ({', '.join('?' * len(chunk))})"
+                for t, dates, close in con.execute(sql, [interval, *chunk]):
+                    out[t] = (dates, close)
+            # Series stored before the packed table existed are packed on first read
+            for t in tickers:
+                if t not in out: out[t] = _pack_closes(con, t, interval)
+        return {t: _unpack(t, *out[t], start) for t in tickers if out[t][0]}
+
+    def stale(self, tickers: list, interval: str) -> list:
+        # needs_update for many tickers (full history) in one meta query
+        tickers, meta = list(dict.fromkeys(tickers)), {}
+        with self._connect() as con:
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                sql = f"SELECT ticker, start, updated FROM meta WHERE interval=? AND ticker IN ({', '.join('?' * len(chunk))})"
+                meta.update((t, (start, updated)) for t, start, updated in con.execute(sql, [interval, *chunk]))
+        now = time.time()
+        return [t for t in tickers if t not in meta or meta[t][0] or now - meta[t][1] > self.refresh_seconds]
+
+    def refresh(self, ticker: str, interval: str = "1d", start: str | None = None):
+        if self.needs_update(ticker, interval, start):
+            # Singleflight: concurrent misses across threads, sessions and replicas wait for one download
+            with file_lock(self._lock_path(ticker, interval)):
+                if self.needs_update(ticker, interval, start):
+                    try:
+                        self.update(ticker, interval, start)
+                    except Exception as e:
+                        # Serve what is already on disk; only fail when there is nothing to serve
+                        if self.last_date(ticker, interval) is None: raise
+                        print(f"Store refresh failed for {ticker} ({interval}), serving cached bars: {e}")
+
+    def load(self, ticker: str, interval: str = "1d", start: str | None = None) -> pd.DataFrame:
+        self.refresh(ticker, interval, start)
+        return self.read(ticker, interval, start)
+
+    def load_close(self, ticker: str, interval: str = "1d", start: str | None = None) -> pd.Series:
+        self.refresh(ticker, interval, start)
+        return self.read_close(ticker, interval, start)
+
+def _pack_closes(con: sqlite3.Connection, ticker: str, interval: str) -> tuple[bytes, bytes]:
+    rows = con.execute("SELECT date, close FROM bars WHERE ticker=? AND interval=? AND close IS NOT NULL ORDER BY date", (ticker, interval)).fetchall()
+    dates, close = zip(*rows) if rows else ((), ())
+    packed = np.array(dates, dtype="datetime64[D]").astype("<i8").tobytes(), np.array(close, dtype="<f8").tobytes()
+    if rows: con.execute("INSERT OR REPLACE INTO closes (ticker, interval, dates, close) VALUES (?, ?, ?, ?)", (ticker, interval, *packed))
+    return packed
+
+def _unpack(ticker: str, dates: bytes, close: bytes, start: str | None = None) -> pd.Series:
+    days = np.frombuffer(dates, dtype="<i8").astype("datetime64[D]")
+    lo = np.searchsorted(days, np.datetime64(pd.Timestamp(start).date(), "D")) if start else 0
+    index = pd.DatetimeIndex(days[lo:].astype("datetime64[us]"), name="Date")
+    return pd.Series(np.frombuffer(close, dtype="<f8")[lo:].copy(), index=index, name=ticker)
+
+def _full_history(provider: DataProvider, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+    # An empty full load is a failed download (yfinance can report errors without raising). Raising keeps the
+    # meta row unwritten, so the ticker is not marked fresh and the caller's retries run.
+    df = provider.history(ticker, start, interval)
+    if df is None or df.empty: raise ValueError(f"No bars returned for {ticker} ({interval})")
+    return df
+
+def _rescaled(df: pd.DataFrame, date: pd.Timestamp, close: float | None) -> bool:
+    if close is None or df is None or date not in df.index: return False
+    fresh = float(df.at[date, "Close"])
+    return not abs(fresh - close) <= RESCALE_TOLERANCE * abs(close)
+
+def _covers(stored_start: str | None, start: str | None) -> bool:
+    if not stored_start: return True
+    return start is not None and pd.Timestamp(start) >= pd.Timestamp(stored_start)
+
+_default_store = None
+
+def get_store() -> PriceStore:
+    global _default_store
+    if _default_store is None: _default_store = PriceStore()
+    return _default_store
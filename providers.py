@@ -0,0 +1,121 @@
+import hashlib
+import os
+import random
+import zlib
+import threading
+import time
+import numpy as np
+import pandas as pd
+from config import FIXTURE_DIR
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+class DataProvider:
+    # Returns an OHLCV frame indexed by bar date, oldest first. start=None means full history.
+    name = "base"
+
+    @property
+    def store_key(self) -> str:
+        # Which price store file holds this provider's bars (see price_store.store_path)
+        return self.name
+
+    def history(self, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+def _normalize(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    if df is None or df.empty: return pd.DataFrame(columns=OHLCV)
+    # Bulletproof column extraction (handles new yfinance MultiIndex updates). A frame without the requested
+    # ticker is someone else's bars, never a fallback.
+    if isinstance(df.columns, pd.MultiIndex):
+        if ticker not in df.columns.get_level_values(-1): raise ValueError(f"Response does not contain {ticker}")
+        df = df.xs(ticker, axis=1, level=-1)
+    df = df[[c for c in OHLCV if c in df.columns]].copy()
+    df.index = pd.to_datetime(df.index).tz_localize(None).normalize()
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(subset=["Close"])
+
+class YahooProvider(DataProvider):
+    name = "yahoo"
+
+    def history(self, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+        # yf.Ticker keeps its own state. yf.download goes through module-global result dicts that
+        # concurrent calls from the fetch scheduler's threads would overwrite.
+        import yfinance as yf
+        kw = {"start": start} if start else {"period": "max"}
+        df = yf.Ticker(ticker).history(interval=interval, auto_adjust=False, actions=False, raise_errors=True, **kw)
+        return _normalize(df, ticker)
+
+class FixtureProvider(DataProvider):
+    # Offline provider reading <directory>/<TICKER>_<interval>.csv (Date index + OHLCV columns)
+    name = "fixture"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @property
+    def store_key(self) -> str:
+        # One store per fixture directory, so two fixture sets never share bars
+        return f"fixture-{hashlib.blake2b(os.path.abspath(self.directory).encode(), digest_size=4).hexdigest()}"
+
+    def path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.directory, f"{ticker.replace('/', '_')}_{interval}.csv")
+
+    def history(self, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+        path = self.path(ticker, interval)
+        if not os.path.exists(path): raise FileNotFoundError(f"No fixture for {ticker} ({interval}) at {path}")
+        df = _normalize(pd.read_csv(path, index_col=0, parse_dates=True), ticker)
+        return df[df.index >= pd.Timestamp(start)] if start else df
+
+class SyntheticProvider(DataProvider):
+    # Seeded geometric-Brownian OHLC bars: reproducible offline data for benchmarks and demos.
+    # Each ticker gets its own stream derived from (seed, ticker), so results don't depend on call order.
+    name = "synthetic"
+    _FREQ = {"1d": "B", "1wk": "W-MON", "1mo": "MS"}
+
+    def __init__(self, years: int = 30, seed: int = 0, end: str | None = None, drift: float = 0.07, vol: float = 0.18):
+        self.years, self.seed, self.drift, self.vol = years, seed, drift, vol
+        self.end = pd.Timestamp(end) if end else pd.Timestamp.today().normalize()
+
+    def history(self, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+        # Business days via a numpy mask: pandas' "B" range generator steps one date at a time
+        days = np.arange(np.datetime64(self.end.date()) - int(self.years * 366) - 7, np.datetime64(self.end.date()) + 1)
+        idx = pd.DatetimeIndex(days[np.is_busday(days)][-int(self.years * 252):])
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        dt = 1 / 252
+        ret = rng.normal((self.drift - 0.5 * self.vol ** 2) * dt, self.vol * np.sqrt(dt), len(idx))
+        close = 100 * np.exp(np.cumsum(ret))
+        opn = np.concatenate([[100.0], close[:-1]]) * np.exp(rng.normal(0, self.vol * np.sqrt(dt) / 4, len(idx)))
+        wick = np.abs(rng.normal(0, self.vol * np.sqrt(dt) / 2, (2, len(idx))))
+        df = pd.DataFrame({
+            "Open": opn, "High": np.maximum(opn, close) * (1 + wick[0]), "Low": np.minimum(opn, close) * (1 - wick[1]),
+            "Close": close, "Volume": rng.integers(100_000, 10_000_000, len(idx)).astype(float)
+        }, index=idx)
+        if interval != "1d":
+            df = df.resample(self._FREQ[interval], label="left", closed="left").agg(
+                {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+        return df[df.index >= pd.Timestamp(start)] if start else df
+
+class FaultyProvider(DataProvider):
+    # Wraps another provider and injects latency and failures, for exercising the fetch scheduler offline
+    name = "faulty"
+
+    def __init__(self, inner: DataProvider, latency: float = 0.0, failure_rate: float = 0.0, fail_tickers: tuple = (), seed: int = 0):
+        self.inner, self.latency, self.failure_rate, self.fail_tickers = inner, latency, failure_rate, set(fail_tickers)
+        self._rng, self._lock, self.calls = random.Random(seed), threading.Lock(), {}
+
+    @property
+    def store_key(self) -> str:
+        return self.inner.store_key
+
+    def history(self, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+        with self._lock:
+            self.calls[ticker] = self.calls.get(ticker, 0) + 1
+            roll = self._rng.random()
+        if self.latency: time.sleep(self.latency)
+        if ticker in self.fail_tickers or roll < self.failure_rate:
+            raise ConnectionError(f"Injected failure for {ticker}")
+        return self.inner.history(ticker, start, interval)
+
+def default_provider() -> DataProvider:
+    if FIXTURE_DIR == "synthetic": return SyntheticProvider()
+    return FixtureProvider(FIXTURE_DIR) if FIXTURE_DIR else YahooProvider()
@@ -0,0 +1,135 @@
+import copy
+import numpy as np
+import pandas as pd
+
+RATIO_WINDOW = 70      # 14 weeks of trading days
+MOMENTUM_WINDOW = 10   # 2 weeks of trading days
+
+def rolling_mean(a: np.ndarray, window: int) -> np.ndarray:
+    # Trailing mean along axis 0 via cumulative sums; NaN until the window is full or if it holds a NaN
+    # (same result as DataFrame.rolling(window).mean()).
+    valid = ~np.isnan(a)
+    csum = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(np.where(valid, a, 0.0), axis=0)])
+    ccnt = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(valid, axis=0)])
+    out = np.full(a.shape, np.nan)
+    if len(a) >= window:
+        s, c = csum[window:] - csum[:-window], ccnt[window:] - ccnt[:-window]
+        out[window - 1:] = np.where(c == window, s / window, np.nan)
+    return out
+
+def _benchmark_matrix(prices: pd.DataFrame, members: list, benchmark) -> np.ndarray:
+    # benchmark is one column for everyone, or a {member: benchmark column} map (e.g. industry ETF -> its sector)
+    if isinstance(benchmark, dict): return prices[[benchmark[m] for m in members]].to_numpy(dtype=float)
+    return np.repeat(prices[[benchmark]].to_numpy(dtype=float), len(members), axis=1)
+
+def _members(prices: pd.DataFrame, benchmark) -> list:
+    if isinstance(benchmark, dict): return [m for m in benchmark if m in prices.columns and benchmark[m] in prices.columns]
+    return [c for c in prices.columns if c != benchmark]
+
+def compute_rrg_history(prices: pd.DataFrame, benchmark="SPY", dtype=np.float32) -> dict:
+    # Full RS-Ratio / RS-Momentum history for any universe as a compact (date x ticker x 2) cube
+    members = _members(prices, benchmark)
+    rs = prices[members].to_numpy(dtype=float) / _benchmark_matrix(prices, members, benchmark)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = rs / rolling_mean(rs, RATIO_WINDOW) * 100
+        momentum = ratio / rolling_mean(ratio, MOMENTUM_WINDOW) * 100
+    return {
+        "cube": np.stack([ratio, momentum], axis=-1).astype(dtype), "dates": prices.index,
+        "tickers": members, "benchmark": benchmark
+    }
+
+def rrg_tail(history: dict, tail_length: int = 15, end=None) -> dict | None:
+    # Tail of complete rows ending at `end` (a date, default: latest), shaped for make_rrg_chart
+    cube, dates = history["cube"], history["dates"]
+    valid = np.isfinite(cube).all(axis=(1, 2))
+    if end is not None: valid &= dates <= pd.Timestamp(end)
+    rows = np.flatnonzero(valid)[-tail_length:]
+    if len(rows) == 0: return None
+    idx = dates[rows]
+    return {
+        "ratio": pd.DataFrame(cube[rows, :, 0], index=idx, columns=history["tickers"]).astype(float),
+        "momentum": pd.DataFrame(cube[rows, :, 1], index=idx, columns=history["tickers"]).astype(float),
+        "current_date": idx[-1].strftime("%b %d, %Y")
+    }
+
+class RRGState:
+    # Rolling state for streaming updates: ring buffers of the last 70 RS values and last 10 RS-Ratios.
+    # update() appends one bar in O(window x tickers) instead of recomputing the whole history.
+    def __init__(self, history: dict, rs_tail: np.ndarray, ratio_tail: np.ndarray):
+        self.history, self.tickers, self.benchmark = history, history["tickers"], history["benchmark"]
+        self._rs = np.full((RATIO_WINDOW, len(self.tickers)), np.nan)
+        self._ratio = np.full((MOMENTUM_WINDOW, len(self.tickers)), np.nan)
+        self._rs_n, self._ratio_n = 0, 0
+        for row in rs_tail: self._push_rs(row)
+        for row in ratio_tail: self._push_ratio(row)
+        self._new_rows, self._new_dates = [], []
+        # Input columns and the last bar consumed, to tell a frame that only adds bars from a rewritten one
+        self.columns = list(dict.fromkeys(self.tickers + (list(self.benchmark.values()) if isinstance(self.benchmark, dict) else [self.benchmark])))
+        self.last_date, self._last_prices = None, None
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame, benchmark="SPY") -> "RRGState":
+        history = compute_rrg_history(prices, benchmark)
+        members = history["tickers"]
+        rs = prices[members].to_numpy(dtype=float) / _benchmark_matrix(prices, members, benchmark)
+        state = cls(history, rs[-RATIO_WINDOW:], history["cube"][-MOMENTUM_WINDOW:, :, 0].astype(float))
+        if len(prices): state.last_date, state._last_prices = prices.index[-1], prices[state.columns].iloc[-1].to_numpy(dtype=float)
+        return state
+
+    def extends(self, prices: pd.DataFrame) -> bool:
+        # True when `prices` still holds the last consumed bar unchanged, so only its later bars are new
+        if self.last_date is None or self.last_date not in prices.index or not set(self.columns) <= set(prices.columns): return False
+        return np.array_equal(prices.loc[self.last_date, self.columns].to_numpy(dtype=float), self._last_prices, equal_nan=True)
+
+    def copy(self) -> "RRGState":
+        # Independent rolling buffers over the same (immutable) history arrays
+        other = copy.copy(self)
+        other._rs, other._ratio = self._rs.copy(), self._ratio.copy()
+        other._new_rows, other._new_dates = list(self._new_rows), list(self._new_dates)
+        return other
+
+    def _push_rs(self, row):
+        self._rs[self._rs_n % RATIO_WINDOW] = row
+        self._rs_n += 1
+
+    def _push_ratio(self, row):
+        self._ratio[self._ratio_n % MOMENTUM_WINDOW] = row
+        self._ratio_n += 1
+
+    def update(self, date, prices_row) -> np.ndarray:
+        # prices_row: mapping/Series holding the new close for every member and benchmark column
+        row = pd.Series(prices_row, dtype=float)
+        bench = row[[self.benchmark[t] for t in self.tickers]] if isinstance(self.benchmark, dict) else row[self.benchmark]
+        rs = row[self.tickers].to_numpy() / np.asarray(bench, dtype=float)
+        self._push_rs(rs)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = rs / self._rs.mean(axis=0) * 100 if self._rs_n >= RATIO_WINDOW else np.full(len(rs), np.nan)
+            self._push_ratio(ratio)
+            momentum = ratio / self._ratio.mean(axis=0) * 100 if self._ratio_n >= MOMENTUM_WINDOW else np.full(len(rs), np.nan)
+        point = np.stack([ratio, momentum], axis=-1).astype(self.history["cube"].dtype)
+        self._new_rows.append(point)
+        self._new_dates.append(pd.Timestamp(date))
+        self.last_date, self._last_prices = pd.Timestamp(date), row[self.columns].to_numpy(dtype=float)
+        return point
+
+    def snapshot(self, start=None) -> dict:
+        # History including every bar added through update(), optionally trimmed to dates >= start
+        if self._new_rows:
+            self.history = {
+                **self.history,
+                "cube": np.concatenate([self.history["cube"], np.stack(self._new_rows)]),
+                "dates": self.history["dates"].append(pd.DatetimeIndex(self._new_dates))
+            }
+            self._new_rows, self._new_dates = [], []
+        if start is not None and len(self.history["dates"]) and self.history["dates"][0] < pd.Timestamp(start):
+            keep = self.history["dates"] >= pd.Timestamp(start)
+            self.history = {**self.history, "cube": self.history["cube"][keep], "dates": self.history["dates"][keep]}
+        return self.history
+
+def advance_rrg_state(state: RRGState | None, prices: pd.DataFrame, benchmark="SPY") -> RRGState:
+    # Feeds the bars after the state's last one through update(). A different universe or benchmark, or a
+    # frame whose last consumed bar changed (a rescaled history), rebuilds from the full frame instead.
+    if state is None or state.benchmark != benchmark or not state.extends(prices):
+        return RRGState.from_prices(prices, benchmark)
+    for date, row in prices[prices.index > state.last_date].iterrows(): state.update(date, row)
+    return state
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from config import CURRENT_YEAR, TIMEFRAMES
+
+WINDOWS = {"5": 5, "10": 10, "max": None}
+
+def period_count(timeframe: str) -> int:
+    return TIMEFRAMES[timeframe][1]
+
+def build_return_cube(roc_frames: dict, timeframe: str) -> dict:
+    # Stacks per-ticker roc frames (year/period/roc columns) into a dense float (ticker x year x period) array
+    return stack_return_cube({
+        t: (f["year"].to_numpy(dtype=int), f["period"].to_numpy(dtype=int), f["roc"].to_numpy(dtype=float))
+        for t, f in roc_frames.items() if f is not None and not f.empty
+    }, timeframe)
+
+def stack_return_cube(roc_arrays: dict, timeframe: str) -> dict:
+    # build_return_cube from {ticker: (year, period, roc)} arrays, skipping the per-ticker frames
+    n_p = period_count(timeframe)
+    tickers = [t for t, a in roc_arrays.items() if len(a[0])]
+    if not tickers:
+        return {"cube": np.empty((0, 0, n_p)), "tickers": [], "years": np.array([], dtype=int), "timeframe": timeframe}
+
+    lengths = np.array([len(roc_arrays[t][0]) for t in tickers])
+    t_idx = np.repeat(np.arange(len(tickers)), lengths)
+    yr = np.concatenate([np.asarray(roc_arrays[t][0], dtype=int) for t in tickers])
+    per = np.concatenate([np.asarray(roc_arrays[t][1], dtype=int) for t in tickers])
+    roc = np.concatenate([np.asarray(roc_arrays[t][2], dtype=float) for t in tickers])
+
+    keep = (per >= 1) & (per <= n_p)
+    years = np.arange(yr.min(), yr.max() + 1)
+    cube = np.full((len(tickers), len(years), n_p), np.nan)
+    cube[t_idx[keep], yr[keep] - years[0], per[keep] - 1] = roc[keep]
+    return {"cube": cube, "tickers": tickers, "years": years, "timeframe": timeframe}
+
+def slice_cube_years(cube_data: dict, start_year: int) -> dict:
+    # Same cube build_return_cube gives for frames filtered to year >= start_year: tickers left with no data
+    # are dropped and the year axis starts at the first year anyone has
+    years = cube_data["years"]
+    block = cube_data["cube"][:, years >= start_year]
+    has = ~np.isnan(block)
+    keep_t, keep_y = has.any(axis=(1, 2)), np.flatnonzero(has.any(axis=(0, 2)))
+    if not keep_t.any():
+        return {**cube_data, "cube": np.empty((0, 0, block.shape[2])), "tickers": [], "years": np.array([], dtype=int)}
+    lo, hi = keep_y[0], keep_y[-1] + 1
+    return {
+        **cube_data, "cube": block[keep_t, lo:hi], "years": years[years >= start_year][lo:hi],
+        "tickers": [t for t, k in zip(cube_data["tickers"], keep_t) if k]
+    }
+
+def window_mask(has_year: np.ndarray, n: int | None) -> np.ndarray:
+    # Last n years that actually hold data for each ticker, same as compute_seasonality's _win on the pivot
+    if n is None: return has_year
+    rank_from_end = np.cumsum(has_year[:, ::-1], axis=1)[:, ::-1]
+    return has_year & (rank_from_end <= n)
+
+def cube_stats(cube: np.ndarray, years: np.ndarray) -> dict:
+    # avg_*/wr_* for every ticker and period in one pass; each result is a (ticker x period) array
+    hist = cube[:, years < CURRENT_YEAR, :]
+    valid = ~np.isnan(hist)
+    has_year = valid.any(axis=2)
+    filled, pos = np.where(valid, hist, 0.0), hist > 0
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for key, n in WINDOWS.items():
+            m = valid & window_mask(has_year, n)[:, :, None]
+            cnt = m.sum(axis=1)
+            out[f"avg_{key}"] = np.where(cnt > 0, (filled * m).sum(axis=1) / cnt, np.nan)
+            out[f"wr_{key}"] = np.where(cnt > 0, (pos & m).sum(axis=1) / cnt * 100, np.nan)
+    out["n_years"] = has_year.sum(axis=1)
+    return out
+
+def screen(cube_data: dict, period: int, sort_by: str = "avg_max", ascending: bool = False) -> pd.DataFrame:
+    cube, years = cube_data["cube"], cube_data["years"]
+    cols = ["Ticker", "Avg_5yr_%", "Avg_10yr_%", "Avg_Max_%", "WinRate_5yr", "WinRate_10yr", "WinRate_Max", "Years", f"{CURRENT_YEAR}_Actual_%"]
+    if cube.size == 0: return pd.DataFrame(columns=cols)
+    stats, p = cube_stats(cube, years), period - 1
+    cur = cube[:, years == CURRENT_YEAR, p][:, 0] if (years == CURRENT_YEAR).any() else np.full(len(cube), np.nan)
+    df = pd.DataFrame({
+        "Ticker": cube_data["tickers"],
+        "Avg_5yr_%": stats["avg_5"][:, p], "Avg_10yr_%": stats["avg_10"][:, p], "Avg_Max_%": stats["avg_max"][:, p],
+        "WinRate_5yr": stats["wr_5"][:, p], "WinRate_10yr": stats["wr_10"][:, p], "WinRate_Max": stats["wr_max"][:, p],
+        "Years": stats["n_years"], f"{CURRENT_YEAR}_Actual_%": cur
+    })
+    sort_col = {"avg_5": "Avg_5yr_%", "avg_10": "Avg_10yr_%", "avg_max": "Avg_Max_%", "wr_5": "WinRate_5yr", "wr_10": "WinRate_10yr", "wr_max": "WinRate_Max"}.get(sort_by, sort_by)
+    return df.sort_values(sort_col, ascending=ascending, na_position="last").reset_index(drop=True)
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from config import DATA_DIR, STORE_REFRESH_SECONDS
+from memo_cache import fingerprint
+import telemetry
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_thread_locks, _thread_locks_guard = {}, threading.Lock()
+
+@contextmanager
+def file_lock(path: str):
+    # Exclusive lock shared by every thread and process on the host. The in-process lock keeps threads
+    # from queueing on the OS lock; the OS lock (flock / msvcrt) coalesces separate processes and replicas.
+    with _thread_locks_guard:
+        tlock = _thread_locks.setdefault(path, threading.Lock())
+    with tlock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a+b") as fh:
+            if fcntl: fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            else: msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl: fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+                else:
+                    fh.seek(0); msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Expired entries are deleted at most this often per process, on the write path
+PRUNE_INTERVAL = 60
+
+class SharedCache:
+    # Pickled results on disk, shared across processes, with singleflight misses: N concurrent misses
+    # for one key run the computation once and the other N-1 callers read its result.
+    def __init__(self, directory: str | None = None, ttl: float = STORE_REFRESH_SECONDS):
+        self.directory = directory or os.path.join(DATA_DIR, "cache")
+        self.ttl = ttl
+        self.hits, self.misses, self.coalesced, self.pruned = 0, 0, 0, 0
+        self._pruned_at = 0.0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def _lock_path(self, path: str) -> str:
+        # Entries share 256 lock files (by the first two hex digits of their name) instead of piling up one per
+        # key; two keys on one stripe only wait for each other's misses
+        return os.path.join(self.directory, "locks", f"{os.path.basename(path)[:2]}.lock")
+
+    def prune(self) -> int:
+        # Entries past the TTL are never read again, and neither are temp files left by a crashed writer
+        cutoff, removed = time.time() - self.ttl, 0
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass  # Already removed by another process, or still open on Windows
+        self._pruned_at = time.time()
+        self.pruned += removed
+        return removed
+
+    def _read(self, path: str):
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl: return False, None
+            with open(path, "rb") as fh:
+                return True, pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def _write(self, path: str, value):
+        # Write-then-rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def get_or_compute(self, key: str, fn):
+        path = self._path(key)
+        hit, value = self._read(path)
+        if hit:
+            self.hits += 1
+            telemetry.count("shared.hit")
+            return value
+        with file_lock(self._lock_path(path)):
+            hit, value = self._read(path)
+            if hit:
+                # Another thread or process computed it while we waited for the lock
+                self.coalesced += 1
+                telemetry.count("shared.coalesced")
+                return value
+            self.misses += 1
+            telemetry.count("shared.miss")
+            value = fn()
+            self._write(path, value)
+        if time.time() - self._pruned_at > PRUNE_INTERVAL: self.prune()
+        return value
+
+    def call(self, fn, *args, **kwargs):
+        key = f"{fn.__module__}.{fn.__qualname__}:{fingerprint((args, kwargs))}"
+        return self.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "pruned": self.pruned}
+
+_shared = None
+
+def get_shared_cache() -> SharedCache:
+    global _shared
+    if _shared is None: _shared = SharedCache()
+    return _shared
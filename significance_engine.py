@@ -0,0 +1,80 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+WINDOWS = {"5": 5, "10": 10, "max": None}
+MIN_YEARS = 3
+
+# Resamples are whole years, expressed as weight matrices so each batch is a few (B x years) @ (years x period)
+# products instead of a (B x years x period) gather:
+#   bootstrap   W[b, y] = times year y was drawn   -> CIs of avg and win rate
+#   sign flip   S[b, y] = +1 / -1                  -> two-sided p-values against "no seasonal effect"
+#               (avg symmetric around 0, win rate 50%)
+
+def _chunk(x: np.ndarray, valid: np.ndarray, seq: np.random.SeedSequence, size: int) -> tuple:
+    rng, n = np.random.default_rng(seq), len(x)
+    filled = np.where(valid, x, 0.0)
+    pos, neg = (filled > 0).astype(float), (filled < 0).astype(float)
+    vf = valid.astype(float)
+
+    draws = rng.integers(0, n, size=(size, n))
+    w = np.bincount((draws + np.arange(size)[:, None] * n).ravel(), minlength=size * n).reshape(size, n).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cnt = w @ vf
+        boot_avg, boot_wr = (w @ filled) / cnt, (w @ pos) / cnt * 100
+
+    flip = rng.integers(0, 2, size=(size, n)).astype(float)
+    null_avg = ((2 * flip - 1) @ filled) / np.maximum(vf.sum(axis=0), 1)
+    null_wr = (flip @ pos + (1 - flip) @ neg) / np.maximum(vf.sum(axis=0), 1) * 100
+    return boot_avg.astype(np.float32), boot_wr.astype(np.float32), null_avg, null_wr
+
+def resample_window(x: np.ndarray, n_resamples: int = 10000, confidence: float = 0.95, seed: int | tuple = 0,
+                    workers: int = 1, chunk_size: int = 2000) -> dict:
+    # x: (year x period) returns with NaN for missing. Chunks are seeded from one SeedSequence, so results
+    # are identical for any worker count.
+    valid = ~np.isnan(x)
+    n_valid = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = np.where(n_valid > 0, np.where(valid, x, 0.0).sum(axis=0) / n_valid, np.nan)
+        wr = np.where(n_valid > 0, (np.where(valid, x, 0.0) > 0).sum(axis=0) / n_valid * 100, np.nan)
+
+    sizes = [min(chunk_size, n_resamples - i) for i in range(0, n_resamples, chunk_size)]
+    seqs = np.random.SeedSequence(seed).spawn(len(sizes))
+    run = lambda args: _chunk(x, valid, *args)
+    if workers > 1 and len(sizes) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool: parts = list(pool.map(run, zip(seqs, sizes)))
+    else:
+        parts = [run(a) for a in zip(seqs, sizes)]
+
+    boot_avg, boot_wr = np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+    null_avg, null_wr = np.concatenate([p[2] for p in parts]), np.concatenate([p[3] for p in parts])
+    q = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN periods
+        avg_lo, avg_hi = np.nanpercentile(boot_avg, q, axis=0)
+        wr_lo, wr_hi = np.nanpercentile(boot_wr, q, axis=0)
+        # (1 + exceedances) / (1 + B) keeps p-values away from an impossible 0
+        p_avg = (1 + (np.abs(null_avg) >= np.abs(avg) * (1 - 1e-9)).sum(axis=0)) / (1 + n_resamples)
+        p_wr = (1 + (np.abs(null_wr - 50) >= np.abs(wr - 50) - 1e-9).sum(axis=0)) / (1 + n_resamples)
+    few = n_valid < MIN_YEARS
+    for arr in (avg_lo, avg_hi, wr_lo, wr_hi, p_avg, p_wr): arr[few] = np.nan
+    return {"avg": avg, "wr": wr, "avg_lo": avg_lo, "avg_hi": avg_hi, "wr_lo": wr_lo, "wr_hi": wr_hi, "p_avg": p_avg, "p_wr": p_wr, "n_years": n_valid}
+
+def seasonal_significance(pivot: pd.DataFrame, periods: list, n_resamples: int = 10000, confidence: float = 0.95,
+                          seed: int = 0, workers: int | None = None) -> dict:
+    # CIs and p-values for compute_seasonality's avg_*/wr_* on the same 5 / 10 / max year windows.
+    # Keys mirror compute_seasonality: avg_5_lo, avg_5_hi, p_avg_5, wr_5_lo, ..., each a Series by period.
+    workers = workers or min(4, os.cpu_count() or 1)
+    pv = pivot.sort_index().reindex(columns=periods)
+    x, idx = pv.to_numpy(dtype=float), pd.Index(periods, name="period")
+    out = {"n_resamples": n_resamples, "confidence": confidence, "seed": seed}
+    for i, (key, n) in enumerate(WINDOWS.items()):
+        rows = x if n is None else x[-n:]
+        # No completed years (e.g. the start year is the current one): every key is present, all NaN
+        res = resample_window(rows, n_resamples, confidence, seed=(seed, i), workers=workers) if len(rows) else {}
+        for stat in ("avg_lo", "avg_hi", "wr_lo", "wr_hi", "p_avg", "p_wr"):
+            name = f"p_{stat[2:]}_{key}" if stat.startswith("p_") else f"{stat[:-3]}_{key}_{stat[-2:]}"
+            out[name] = pd.Series(res.get(stat, np.nan), index=idx, dtype=float)
+    return out
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from config import DATA_DIR
+from screener_engine import cube_stats
+from cycle_engine import compute_cycle_universe
+
+try:
+    from scipy.cluster.hierarchy import linkage, fcluster
+    from scipy.spatial.distance import squareform
+except ImportError:  # clustering is optional; nearest-neighbour queries only need NumPy
+    linkage = None
+
+SIMILARITY_DIR = os.path.join(DATA_DIR, "similarity")
+METRICS = ["correlation", "cosine"]
+
+def _standardize(x: np.ndarray) -> np.ndarray:
+    # Per-row z-score so profiles compare on shape rather than volatility; NaN periods count as average
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (x - np.nanmean(x, axis=1, keepdims=True)) / np.nanstd(x, axis=1, keepdims=True)
+    return np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+
+def profile_features(avg: np.ndarray, wr: np.ndarray, wr_weight: float = 0.5) -> np.ndarray:
+    # (ticker x 2*period) rows: standardized average returns followed by standardized win rates
+    a, w = np.atleast_2d(avg), np.atleast_2d(wr)
+    return np.hstack([_standardize(a) * np.sqrt(1 - wr_weight), _standardize(w) * np.sqrt(wr_weight)]).astype(np.float32)
+
+def seasonal_profiles(cube_data: dict, window: str = "max", wr_weight: float = 0.5) -> tuple:
+    # Same avg_*/wr_* per ticker as compute_seasonality, taken from the universe cube in one pass
+    if cube_data["cube"].size == 0: return [], np.empty((0, 0), dtype=np.float32)
+    stats = cube_stats(cube_data["cube"], cube_data["years"])
+    return list(cube_data["tickers"]), profile_features(stats[f"avg_{window}"], stats[f"wr_{window}"], wr_weight)
+
+def cycle_profiles(cube_data: dict, length: int = 4, anchor: int = 1, wr_weight: float = 0.5) -> tuple:
+    # Multi-year cycle shape per ticker (e.g. 48 monthly steps for the presidential cycle) from a monthly cube
+    if cube_data["cube"].size == 0: return [], np.empty((0, 0), dtype=np.float32)
+    cyc = compute_cycle_universe(cube_data["cube"], cube_data["years"], length, anchor)
+    return list(cube_data["tickers"]), profile_features(cyc["avg_roc"], cyc["wr"], wr_weight)
+
+def cycle_query(cycle_data: dict, wr_weight: float = 0.5) -> np.ndarray:
+    # Query row for a compute_cycle_seasonality result (e.g. the S&P 500 presidential path)
+    rets = cycle_data["cycle_returns"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wr = (rets > 0).sum().to_numpy() / rets.notna().sum().to_numpy() * 100
+    return profile_features(cycle_data["avg_roc"].reindex(rets.columns).to_numpy(dtype=float), wr, wr_weight)
+
+def _normalize(x: np.ndarray, metric: str) -> np.ndarray:
+    # Unit rows, so a dot product is cosine similarity; centring the rows first turns it into Pearson correlation
+    x = np.atleast_2d(np.asarray(x, dtype=np.float32))
+    if metric == "correlation": x = x - x.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(x, axis=1, keepdims=True)
+    return np.divide(x, norm, out=np.zeros_like(x), where=norm > 0)
+
+class SimilarityIndex:
+    # Feature rows per ticker plus a per-ticker stamp of the inputs they came from. Persisted as one .npz,
+    # so a rebuild only recomputes tickers whose stamp changed; normalized matrices are derived lazily.
+    def __init__(self, name: str, tickers: list | None = None, features: np.ndarray | None = None, stamps: list | None = None):
+        self.name, self.tickers = name, list(tickers or [])
+        self.features = features if features is not None else np.empty((0, 0), dtype=np.float32)
+        self.stamps = list(stamps or [""] * len(self.tickers))
+        self._pos = {t: i for i, t in enumerate(self.tickers)}
+        self._norm = {}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._pos
+
+    @staticmethod
+    def path(name: str, directory: str = SIMILARITY_DIR) -> str:
+        return os.path.join(directory, f"{name}.npz")
+
+    @classmethod
+    def load(cls, name: str, directory: str = SIMILARITY_DIR) -> "SimilarityIndex":
+        try:
+            with np.load(cls.path(name, directory), allow_pickle=False) as z:
+                return cls(name, z["tickers"].tolist(), z["features"], z["stamps"].tolist())
+        except (OSError, KeyError, ValueError):
+            return cls(name)
+
+    def save(self, directory: str = SIMILARITY_DIR):
+        # Write-then-rename so concurrent readers never load a partial file
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(fd, "wb") as fh:
+            np.savez(fh, tickers=np.array(self.tickers, dtype=str), features=self.features, stamps=np.array(self.stamps, dtype=str))
+        os.replace(tmp, self.path(self.name, directory))
+
+    def stale(self, stamps: dict) -> list:
+        # Tickers that are new or whose input stamp changed since they were indexed
+        return [t for t, s in stamps.items() if t not in self._pos or self.stamps[self._pos[t]] != s]
+
+    def upsert(self, tickers: list, features: np.ndarray, stamps: list):
+        if not len(tickers): return
+        if self.features.size and self.features.shape[1] != features.shape[1]:
+            # Profile length changed (different timeframe/cycle settings): start over
+            self.tickers, self.stamps, self.features, self._pos = [], [], np.empty((0, features.shape[1]), dtype=np.float32), {}
+        if not self.features.size: self.features = np.empty((0, features.shape[1]), dtype=np.float32)
+        new = [t for t in tickers if t not in self._pos]
+        self.features = np.vstack([self.features, np.zeros((len(new), features.shape[1]), dtype=np.float32)])
+        for t in new:
+            self._pos[t] = len(self.tickers); self.tickers.append(t); self.stamps.append("")
+        rows = np.array([self._pos[t] for t in tickers])
+        self.features[rows] = features
+        for t, s in zip(tickers, stamps): self.stamps[self._pos[t]] = s
+        self._norm = {}
+
+    def matrix(self, metric: str = "correlation") -> np.ndarray:
+        if metric not in self._norm: self._norm[metric] = _normalize(self.features, metric)
+        return self._norm[metric]
+
+    def vectors(self, tickers: list) -> np.ndarray:
+        return self.features[[self._pos[t] for t in tickers]]
+
+    def query(self, queries, k: int = 10, metric: str = "correlation", labels: list | None = None, universe: list | None = None) -> pd.DataFrame:
+        # Batched top-k: queries are tickers in the index or raw (m x d) feature rows. One (m x d) @ (d x N)
+        # product scores every pair, argpartition picks the k best per query without a full sort.
+        if isinstance(queries, (list, tuple)) and queries and isinstance(queries[0], str):
+            labels, q = list(queries), self.vectors(list(queries))
+        else:
+            q = np.atleast_2d(queries)
+            labels = labels or [f"query_{i}" for i in range(len(q))]
+        m = self.matrix(metric)
+        cols = ["Query", "Rank", "Ticker", "Similarity"]
+        if not len(m) or not len(q): return pd.DataFrame(columns=cols)
+        scores = _normalize(q, metric) @ m.T
+        for i, lbl in enumerate(labels):
+            if lbl in self._pos: scores[i, self._pos[lbl]] = -np.inf  # never match a query to itself
+        if universe is not None:
+            keep = np.zeros(len(self.tickers), dtype=bool)
+            keep[[self._pos[t] for t in universe if t in self._pos]] = True
+            scores[:, ~keep] = -np.inf
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        best = np.take_along_axis(scores, top, axis=1)
+        ok = np.isfinite(best)
+        return pd.DataFrame({
+            "Query": np.repeat(np.array(labels, dtype=object), k)[ok.ravel()], "Rank": np.tile(np.arange(1, k + 1), len(q))[ok.ravel()],
+            "Ticker": np.array(self.tickers, dtype=object)[top][ok], "Similarity": best[ok]
+        })
+
+    def cluster(self, n_clusters: int = 6, metric: str = "correlation", tickers: list | None = None) -> pd.Series | None:
+        # Average-linkage hierarchical clustering on 1 - similarity; needs SciPy
+        if linkage is None: return None
+        tickers = [t for t in (tickers or self.tickers) if t in self._pos]
+        if len(tickers) < 2: return pd.Series(1, index=tickers, name="Cluster")
+        m = self.matrix(metric)[[self._pos[t] for t in tickers]]
+        dist = np.clip(1 - m @ m.T, 0, 2).astype(float)
+        np.fill_diagonal(dist, 0)
+        labels = fcluster(linkage(squareform(dist, checks=False), method="average"), t=min(n_clusters, len(tickers)), criterion="maxclust")
+        return pd.Series(labels, index=tickers, name="Cluster")
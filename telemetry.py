@@ -0,0 +1,74 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("seasonality.telemetry")
+
+# Off unless SEASONALITY_DIAGNOSTICS=1 or a run opts in through begin_run(enabled=True). State is
+# thread-local because Streamlit runs every session's script on its own thread.
+DEFAULT_ENABLED = os.environ.get("SEASONALITY_DIAGNOSTICS") == "1"
+_local = threading.local()
+
+def enabled() -> bool:
+    return getattr(_local, "enabled", DEFAULT_ENABLED)
+
+def begin_run(enabled: bool | None = None):
+    _local.enabled = DEFAULT_ENABLED if enabled is None else enabled
+    _local.run = {"started": time.time(), "timings": [], "counters": {}, "figures": []}
+
+def _run() -> dict:
+    if getattr(_local, "run", None) is None: begin_run(enabled())
+    return _local.run
+
+@contextmanager
+def _measure(stage: str, name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _run()["timings"].append({"stage": stage, "name": name, "ms": (time.perf_counter() - t0) * 1000})
+
+@contextmanager
+def _noop():
+    yield
+
+def span(stage: str, name: str):
+    # Context-manager form: `with span("render", "tab1"): ...`
+    return _measure(stage, name) if enabled() else _noop()
+
+def timed(stage: str):
+    # Decorator form; when disabled the only overhead is one thread-local lookup per call
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled(): return fn(*args, **kwargs)
+            with _measure(stage, fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def count(name: str, n: int = 1):
+    if enabled():
+        counters = _run()["counters"]
+        counters[name] = counters.get(name, 0) + n
+
+def record_figure(name: str, fig):
+    # Trace count and serialized size, i.e. roughly what is shipped to the browser for this chart.
+    # fig is a go.Figure or an already-serialized spec (figure_codec.compact_figure).
+    if enabled():
+        spec = fig if isinstance(fig, str) else fig.to_json()
+        _run()["figures"].append({"name": name, "traces": len(json.loads(spec)["data"]), "bytes": len(spec.encode("utf-8"))})
+
+def snapshot(extra: dict | None = None) -> dict:
+    run = _run()
+    return {**run, "total_ms": (time.time() - run["started"]) * 1000, **(extra or {})}
+
+def export_json(extra: dict | None = None) -> str:
+    return json.dumps(snapshot(extra), indent=2, default=str)
+
+def log_run(extra: dict | None = None):
+    if enabled(): logger.info(json.dumps(snapshot(extra), default=str))
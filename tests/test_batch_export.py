@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import batch_export
+import cube_store
+import data_engine
+
+def _fixture(directory, ticker: str, years: int = 3):
+    idx = pd.bdate_range(end="2024-12-31", periods=252 * years, name="Date")
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, len(idx))))
+    pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6}, index=idx).to_csv(directory / f"{ticker}_1d.csv")
+
+def _run(tmp_path, tickers: list, *extra) -> int:
+    (tmp_path / "tickers.txt").write_text("\n".join(tickers))
+    return batch_export.main([
+        "--tickers", str(tmp_path / "tickers.txt"), "--data-dir", str(tmp_path / "fixtures"),
+        "--store", str(tmp_path / "prices.sqlite"), "--out", str(tmp_path / "out"), "--workers", "1", *extra
+    ])
+
+def test_partial_failure_exits_nonzero(tmp_path):
+    (tmp_path / "fixtures").mkdir()
+    _fixture(tmp_path / "fixtures", "AAA")
+    assert _run(tmp_path, ["AAA"]) == 0
+    # One missing ticker fails the run, but the others are still written
+    assert _run(tmp_path, ["AAA", "MISSING"]) == 1
+    assert (tmp_path / "out" / "AAA_seasonality.csv").exists()
+
+def test_truncated_cube_falls_back_before_its_start_year(tmp_path, monkeypatch):
+    (tmp_path / "fixtures").mkdir()
+    _fixture(tmp_path / "fixtures", "AAA", years=10)
+    _fixture(tmp_path / "fixtures", "BBB", years=2)
+    assert _run(tmp_path, ["AAA", "BBB"], "--timeframes", "Monthly", "--start-year", "2018", "--cube", str(tmp_path / "cube")) == 0
+    monkeypatch.setattr(data_engine, "open_cube", lambda tf: cube_store.open_cube(tf, str(tmp_path / "cube")))
+
+    # AAA's history goes back to 2015 but the cube stops at 2018: earlier start years must use the live pivot
+    assert data_engine.cube_pivot("AAA", "Monthly", 2016) is None
+    assert data_engine.cube_pivot("AAA", "Monthly", 2018).index[0] == 2018
+    assert data_engine.cube_pivot("AAA", "Monthly", 2020).index[0] == 2020
+    # BBB starts after the cut, so the cube holds all of it
+    assert data_engine.cube_pivot("BBB", "Monthly", 2000).index[0] == 2023
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from data_engine import forward_returns, trading_day_of_year
+
+# Last three sessions of 2023 and the first six of 2024 (Jan 1 is a holiday)
+DATES = pd.DatetimeIndex(["2023-12-27", "2023-12-28", "2023-12-29", "2024-01-02", "2024-01-03", "2024-01-04",
+                          "2024-01-05", "2024-01-08", "2024-01-09"])
+CLOSE = np.array([100.0, 101.0, 102.0, 104.0, 103.0, 105.0, 106.0, 108.0, 110.0])
+
+def test_one_day_forward_return_is_the_daily_change():
+    expected = [np.nan, 101 / 100, 102 / 101, 104 / 102, 103 / 104, 105 / 103, 106 / 105, 108 / 106, 110 / 108]
+    np.testing.assert_allclose(forward_returns(CLOSE, 1), np.array(expected) - 1)
+
+def test_five_day_forward_return_spans_the_year_boundary():
+    # The window starting on 2024-01-02 (index 3) runs from the 2023-12-29 close to the 2024-01-08 close
+    expected = [np.nan, 105 / 100, 106 / 101, 108 / 102, 110 / 104, np.nan, np.nan, np.nan, np.nan]
+    np.testing.assert_allclose(forward_returns(CLOSE, 5), np.array(expected) - 1)
+    assert np.isnan(forward_returns(CLOSE[:5], 5)).all()
+
+def test_trading_day_restarts_each_year():
+    np.testing.assert_array_equal(trading_day_of_year(DATES), [1, 2, 3, 1, 2, 3, 4, 5, 6])
+    # A year with a gap in the data still counts sessions, not calendar days
+    gapped = DATES.append(pd.DatetimeIndex(["2024-03-01", "2025-01-02"]))
+    np.testing.assert_array_equal(trading_day_of_year(gapped), [1, 2, 3, 1, 2, 3, 4, 5, 6, 7, 1])
+    assert len(trading_day_of_year(pd.DatetimeIndex([]))) == 0
@@ -0,0 +1,41 @@
+import pandas as pd
+from fetch_engine import fetch_many
+from providers import FaultyProvider, SyntheticProvider
+
+def _fetch(provider: FaultyProvider):
+    return lambda t: provider.history(t, None, "1mo")["Close"]
+
+def test_failing_ticker_is_retried_with_backoff_and_reported():
+    provider, sleeps = FaultyProvider(SyntheticProvider(years=3), fail_tickers=("BAD",)), []
+    report = fetch_many(["AAA", "BAD", "BBB"], _fetch(provider), retries=3, backoff=0.5, sleep=sleeps.append)
+
+    assert set(report.results) == {"AAA", "BBB"}
+    assert list(report.failures) == ["BAD"] and "Injected failure for BAD" in report.failures["BAD"]
+    assert not report.ok
+    assert report.attempts == {"AAA": 1, "BAD": 3, "BBB": 1}
+    assert provider.calls["BAD"] == 3
+    assert sleeps == [0.5, 1.0]
+    assert set(report.timings) == {"AAA", "BAD", "BBB"}
+
+def test_transient_failures_recover_within_retries():
+    provider, sleeps = FaultyProvider(SyntheticProvider(years=3), failure_rate=0.5, seed=1), []
+    tickers = [f"T{i}" for i in range(10)]
+    report = fetch_many(tickers, _fetch(provider), max_workers=1, retries=30, backoff=0.1, sleep=sleeps.append)
+
+    assert report.ok and list(report.results) == tickers
+    assert any(n > 1 for n in report.attempts.values())
+    assert len(sleeps) == sum(report.attempts.values()) - len(tickers)
+    pd.testing.assert_series_equal(report.results["T3"], SyntheticProvider(years=3).history("T3", None, "1mo")["Close"])
+
+def test_latency_runs_concurrently():
+    provider = FaultyProvider(SyntheticProvider(years=1), latency=0.2)
+    report = fetch_many([f"T{i}" for i in range(8)], _fetch(provider), max_workers=8)
+    assert report.ok
+    # Eight 0.2s calls on eight threads overlap instead of taking 1.6s back to back
+    assert max(report.timings.values()) < 1.0 and sum(provider.calls.values()) == 8
+
+def test_duplicate_and_empty_keys():
+    provider = FaultyProvider(SyntheticProvider(years=1))
+    assert fetch_many([], _fetch(provider)).ok
+    report = fetch_many(["A", "A", "B"], _fetch(provider))
+    assert list(report.results) == ["A", "B"] and provider.calls == {"A": 1, "B": 1}
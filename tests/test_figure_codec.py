@@ -0,0 +1,47 @@
+import json
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+from figure_codec import SerializedFigure, _decode, compact_figure, encode_array, lttb
+
+def test_fractional_year_axis_stays_increasing():
+    # Daily backtest timeline: steps of 1/252 year would collapse if rounded to 2 decimals
+    x = 2000 + np.arange(1200) / 252
+    spec = json.loads(compact_figure(go.Figure(go.Scatter(x=x, y=np.cumsum(np.sin(x)), mode="lines")), width_px=2000))
+    got = _decode(spec["data"][0]["x"])
+    np.testing.assert_array_equal(got, x)
+    assert np.all(np.diff(got) > 0)
+
+def test_values_are_rounded_and_typed():
+    y = np.array([1.23456, -2.5, 3.0])
+    spec = json.loads(compact_figure(go.Figure(go.Bar(x=[1, 2, 3], y=y, error_y=dict(array=[0.123, 0.456, 0.789])))))
+    trace = spec["data"][0]
+    assert trace["x"]["dtype"] == "i1"
+    np.testing.assert_allclose(_decode(trace["y"]), [1.23, -2.5, 3.0], rtol=1e-6)
+    np.testing.assert_allclose(_decode(trace["error_y"]["array"]), [0.12, 0.46, 0.79], rtol=1e-6)
+
+def test_exact_encoding_without_precision():
+    a = np.array([0.1, 1 / 3, 2e9 + 0.5])
+    assert encode_array(a, None)["dtype"] == "f8"
+    np.testing.assert_array_equal(_decode(encode_array(a, None)), a)
+    assert encode_array(np.arange(5.0), None)["dtype"] == "i1"
+
+def test_long_lines_are_thinned_and_dates_shortened():
+    idx = pd.date_range("1928-01-31", periods=1200, freq="ME")
+    fig = go.Figure(go.Scatter(x=idx, y=np.random.default_rng(0).normal(size=1200).cumsum(), mode="lines"))
+    trace = json.loads(compact_figure(fig, width_px=300))["data"][0]
+    assert len(trace["x"]) == 300 and trace["x"][0] == "1928-01-31"
+
+def test_lttb_keeps_extremes():
+    y = np.zeros(1000)
+    y[123], y[777] = 10, -10
+    keep = lttb(np.arange(1000.0), y, 50)
+    assert {0, 123, 777, 999} <= set(keep)
+
+def test_serialized_figure_goes_through_streamlit_path():
+    spec = compact_figure(go.Figure(go.Scatter(x=[1, 2, 3], y=[1.0, 2.0, 3.0])))
+    figure = plotly.tools.return_figure_from_figure_or_data(SerializedFigure(spec), validate_figure=True)
+    assert figure == json.loads(spec)
+    assert json.loads(pio.to_json(figure, validate=False)) == json.loads(spec)
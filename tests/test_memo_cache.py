@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import memo_cache
+from memo_cache import MemoCache
+
+def _frame(n: int = 1000) -> pd.DataFrame:
+    return pd.DataFrame({"roc": np.random.default_rng(0).normal(size=n)}, index=pd.date_range("2000-01-01", periods=n))
+
+def _stats(df: pd.DataFrame) -> dict:
+    return {"avg": df["roc"].mean(), "pivot": df.groupby(df.index.year)["roc"].mean()}
+
+def _figure(stats: dict) -> str:
+    return f"{stats['avg']:.6f}"
+
+def test_chained_result_hits_without_rehashing(monkeypatch):
+    memo = MemoCache()
+    stats = memo.call(_stats, _frame())
+    first = memo.call(_figure, stats)
+
+    # The stats dict came out of the cache, so it is keyed by its tag; none of its frames are hashed again
+    hashed = []
+    real = memo_cache.pd.util.hash_pandas_object
+    monkeypatch.setattr(memo_cache.pd.util, "hash_pandas_object", lambda obj, **kw: hashed.append(obj) or real(obj, **kw))
+    assert memo.call(_figure, stats) == first
+    assert memo.by_name["_figure"] == {"hits": 1, "misses": 1} and hashed == []
+
+    # An equal frame built again (a rerun) hits the whole chain by content
+    again = memo.call(_stats, _frame())
+    assert again is stats and memo.call(_figure, again) == first
+    assert memo.stats()["misses"] == 2 and memo.stats()["hits"] == 3
+
+def test_evicted_result_is_fingerprinted_by_content():
+    memo = MemoCache(maxsize=1)
+    stats = memo.call(_stats, _frame())
+    first = memo.call(_figure, stats)  # evicts the stats entry and its tag
+    # Without its tag the dict is keyed by content: one recompute, then equal inputs hit that entry
+    assert memo.call(_figure, stats) == first
+    assert memo.call(_figure, _stats(_frame())) == first
+    assert memo.by_name["_figure"] == {"hits": 1, "misses": 2}
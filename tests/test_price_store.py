@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fetch_engine import fetch_many
+from price_store import PriceStore, store_path
+from providers import OHLCV, FixtureProvider, SyntheticProvider, YahooProvider
+
+def _bars(close: np.ndarray, start: str = "2024-01-02") -> pd.DataFrame:
+    idx = pd.bdate_range(start, periods=len(close), name="Date")
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6}, index=idx)
+
+def _fixture(tmp_path, df: pd.DataFrame, ticker: str = "AAA"):
+    df.to_csv(tmp_path / "fixtures" / f"{ticker}_1d.csv")
+
+def _store(tmp_path) -> PriceStore:
+    (tmp_path / "fixtures").mkdir(exist_ok=True)
+    return PriceStore(str(tmp_path / "prices.sqlite"), provider=FixtureProvider(str(tmp_path / "fixtures")), refresh_seconds=0)
+
+def test_split_after_last_bar_reloads_history(tmp_path):
+    store = _store(tmp_path)
+    close = np.linspace(100, 120, 40)
+    _fixture(tmp_path, _bars(close))
+    store.load_close("AAA")
+
+    # 4:1 split after the last stored bar: the provider now reports every earlier close divided by 4
+    split = np.concatenate([close / 4, np.linspace(30.1, 31, 5)])
+    _fixture(tmp_path, _bars(split))
+    got = store.load_close("AAA")
+
+    assert len(got) == len(split)
+    np.testing.assert_allclose(got.to_numpy(), split)
+    assert got.pct_change().abs().max() < 0.05
+
+def test_forming_last_bar_does_not_trigger_reload(tmp_path):
+    store = _store(tmp_path)
+    close = np.linspace(100, 120, 40)
+    _fixture(tmp_path, _bars(close))
+    store.load_close("AAA")
+
+    # Only the still-forming last bar moves; the settled history must stay untouched
+    revised = np.concatenate([close[:-1], [125.0], [126.0]])
+    _fixture(tmp_path, _bars(revised))
+    rows = []
+    store.write = lambda *a, **kw: rows.append(kw.get("replace", False)) or PriceStore.write(store, *a, **kw)
+    got = store.load_close("AAA")
+
+    assert rows == [False]
+    np.testing.assert_allclose(got.to_numpy(), revised)
+
+def test_offline_providers_get_their_own_store():
+    live = store_path(YahooProvider())
+    assert live.endswith("prices.sqlite")
+    assert store_path(SyntheticProvider()) != live
+    assert store_path(FixtureProvider("a")) not in (live, store_path(FixtureProvider("b")))
+
+def test_refresh_appends_only_new_bars(tmp_path):
+    store = _store(tmp_path)
+    close = np.linspace(100, 120, 40)
+    _fixture(tmp_path, _bars(close))
+    first = store.load("AAA")
+    assert len(first) == 40 and store.last_date("AAA", "1d") == first.index[-1]
+
+    grown = np.concatenate([close, np.linspace(121, 125, 5)])
+    _fixture(tmp_path, _bars(grown))
+    starts = []
+    history = store.provider.history
+    store.provider.history = lambda t, start, interval: starts.append(start) or history(t, start, interval)
+    got = store.load("AAA")
+
+    # One incremental request from the settled second-newest bar, then all 45 bars come back from disk
+    assert starts == [first.index[-2].strftime("%Y-%m-%d")]
+    assert len(got) == 45
+    np.testing.assert_allclose(got["Close"].to_numpy(), grown)
+    pd.testing.assert_frame_equal(got.iloc[:40], first)
+
+def test_fresh_store_is_served_without_provider_calls(tmp_path):
+    store = _store(tmp_path)
+    _fixture(tmp_path, _bars(np.linspace(100, 120, 10)))
+    store.refresh_seconds = 3600
+    store.load("AAA")
+    store.provider.history = lambda *a: (_ for _ in ()).throw(AssertionError("unexpected fetch"))
+    assert len(store.load_close("AAA")) == 10
+
+def test_failed_refresh_serves_stored_bars(tmp_path):
+    store = _store(tmp_path)
+    _fixture(tmp_path, _bars(np.linspace(100, 120, 10)))
+    store.load("AAA")
+    (tmp_path / "fixtures" / "AAA_1d.csv").unlink()
+    assert len(store.load_close("AAA")) == 10
+
+class _FlakyProvider(FixtureProvider):
+    # Returns an empty frame on the first `empty_calls` requests, like a yfinance download that only logs its error
+    def __init__(self, directory: str, empty_calls: int):
+        super().__init__(directory)
+        self.empty_calls, self.calls = empty_calls, 0
+
+    def history(self, ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+        self.calls += 1
+        return pd.DataFrame(columns=OHLCV) if self.calls <= self.empty_calls else super().history(ticker, start, interval)
+
+def test_empty_full_load_is_retried_not_marked_fresh(tmp_path):
+    (tmp_path / "fixtures").mkdir()
+    _fixture(tmp_path, _bars(np.linspace(100, 120, 10)))
+    provider = _FlakyProvider(str(tmp_path / "fixtures"), empty_calls=2)
+    store = PriceStore(str(tmp_path / "prices.sqlite"), provider=provider)
+    report = fetch_many(["AAA"], lambda t: store.load_close(t), retries=3, sleep=lambda s: None)
+
+    assert report.ok and report.attempts["AAA"] == 3 and provider.calls == 3
+    assert len(report.results["AAA"]) == 10
+
+def test_empty_full_load_leaves_no_meta(tmp_path):
+    (tmp_path / "fixtures").mkdir()
+    store = PriceStore(str(tmp_path / "prices.sqlite"), provider=_FlakyProvider(str(tmp_path / "fixtures"), empty_calls=1))
+    with pytest.raises(ValueError, match="No bars returned"):
+        store.load_close("AAA")
+    assert store.meta("AAA", "1d") is None and store.needs_update("AAA", "1d")
+
+def test_bulk_close_read_matches_bar_reads(tmp_path):
+    store = _store(tmp_path)
+    _fixture(tmp_path, _bars(np.linspace(100, 120, 40)), "AAA")
+    _fixture(tmp_path, _bars(np.linspace(50, 40, 30), "2024-01-15"), "BBB")
+    for t in ("AAA", "BBB"): store.load(t)
+    # An incremental write must repack the series, and a series stored without a packed row is packed on read
+    _fixture(tmp_path, _bars(np.linspace(100, 125, 45)), "AAA")
+    store.load("AAA")
+    with store._connect() as con:
+        con.execute("DELETE FROM closes WHERE ticker='BBB'")
+
+    for start in (None, "2024-02-01"):
+        got = store.read_closes(["AAA", "BBB", "MISSING"], "1d", start)
+        assert list(got) == ["AAA", "BBB"]
+        for t, close in got.items():
+            pd.testing.assert_series_equal(close, store.read(t, "1d", start)["Close"].rename(t))
+
+def test_stale_matches_needs_update(tmp_path):
+    store = _store(tmp_path)
+    store.refresh_seconds = 3600
+    _fixture(tmp_path, _bars(np.linspace(100, 120, 10)), "AAA")
+    _fixture(tmp_path, _bars(np.linspace(100, 120, 10)), "BBB")
+    store.load("AAA")
+    store.load("BBB", start="2024-01-05")
+    # BBB only holds a partial range and CCC nothing, so a full-history request must refresh both
+    assert store.stale(["AAA", "BBB", "CCC", "AAA"], "1d") == ["BBB", "CCC"]
+    assert [t for t in ("AAA", "BBB", "CCC") if store.needs_update(t, "1d")] == ["BBB", "CCC"]
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+from providers import OHLCV, YahooProvider, _normalize
+
+def _frame(tz: str | None = None) -> pd.DataFrame:
+    idx = pd.date_range("2024-01-02", periods=3, freq="B", tz=tz)
+    return pd.DataFrame({c: [1.0, 2.0, 3.0] for c in OHLCV + ["Adj Close"]}, index=idx)
+
+def test_multiindex_picks_requested_ticker():
+    df = pd.concat({"AAA": _frame(), "BBB": _frame() * 10}, axis=1).swaplevel(axis=1)
+    assert _normalize(df, "BBB")["Close"].tolist() == [10.0, 20.0, 30.0]
+
+def test_multiindex_without_ticker_raises():
+    df = pd.concat({"BBB": _frame()}, axis=1).swaplevel(axis=1)
+    with pytest.raises(ValueError, match="AAA"):
+        _normalize(df, "AAA")
+
+def test_yahoo_uses_per_ticker_history(monkeypatch):
+    yf = pytest.importorskip("yfinance")
+    calls = []
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, **kw):
+            calls.append((self.symbol, kw))
+            return _frame("America/New_York")
+
+    monkeypatch.setattr(yf, "Ticker", FakeTicker)
+    df = YahooProvider().history("QQQ", "2024-01-01", "1d")
+    assert calls == [("QQQ", {"interval": "1d", "auto_adjust": False, "actions": False, "raise_errors": True, "start": "2024-01-01"})]
+    assert list(df.columns) == OHLCV and df.index.tz is None and df.index[0] == pd.Timestamp("2024-01-02")
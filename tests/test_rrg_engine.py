@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from providers import SyntheticProvider
+from rrg_engine import RRGState, advance_rrg_state, compute_rrg_history
+
+def _prices(n: int = 300) -> pd.DataFrame:
+    provider = SyntheticProvider(years=2, end="2024-06-28")
+    return pd.DataFrame({t: provider.history(t, None, "1d")["Close"] for t in ["SPY", "XLK", "XLF", "XLE"]}).iloc[-n:]
+
+def test_incremental_updates_match_full_recompute():
+    prices = _prices()
+    state = RRGState.from_prices(prices.iloc[:200])
+    for date, row in prices.iloc[200:].iterrows(): state.update(date, row)
+    got, full = state.snapshot(), compute_rrg_history(prices)
+    assert got["tickers"] == full["tickers"]
+    assert got["dates"].equals(full["dates"])
+    np.testing.assert_allclose(got["cube"], full["cube"], rtol=1e-6)
+
+def test_advance_only_feeds_new_bars():
+    prices = _prices()
+    state = RRGState.from_prices(prices.iloc[:250])
+    advanced = advance_rrg_state(state, prices.iloc[:260])
+    assert advanced is state and state.last_date == prices.index[259]
+    np.testing.assert_allclose(state.snapshot()["cube"], compute_rrg_history(prices.iloc[:260])["cube"], rtol=1e-6)
+
+def test_advance_rebuilds_when_history_changes():
+    prices = _prices()
+    state = RRGState.from_prices(prices.iloc[:250])
+    rescaled = prices.assign(XLK=prices["XLK"] / 4)
+    assert advance_rrg_state(state, rescaled) is not state
+    assert advance_rrg_state(state, prices[["SPY", "XLK"]]) is not state
+
+def test_copy_keeps_settled_state():
+    prices = _prices()
+    state = RRGState.from_prices(prices.iloc[:-1])
+    head = state.copy()
+    head.update(prices.index[-1], prices.iloc[-1])
+    assert len(head.snapshot()["dates"]) == len(prices)
+    assert len(state.snapshot()["dates"]) == len(prices) - 1 and state.last_date == prices.index[-2]
+    # A trimmed snapshot drops dates before the window start but keeps their rolling values behind it
+    assert state.snapshot(prices.index[100])["dates"][0] == prices.index[100]
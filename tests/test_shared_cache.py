@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+import time
+from shared_cache import SharedCache
+
+def _slow_compute(log: str) -> int:
+    with open(log, "a") as fh:
+        fh.write(f"{os.getpid()}\n")
+    time.sleep(0.5)
+    return os.getpid()
+
+def _worker(directory: str, log: str, barrier, results):
+    cache = SharedCache(directory)
+    barrier.wait()
+    results.put((cache.get_or_compute("QQQ", lambda: _slow_compute(log)), cache.stats()))
+
+def test_concurrent_misses_across_processes_compute_once(tmp_path):
+    # Eight separate processes miss on one key at the same moment: exactly one computes, the rest read its result
+    ctx, n = multiprocessing.get_context("spawn"), 8
+    barrier, results, log = ctx.Barrier(n), ctx.Queue(), str(tmp_path / "calls.log")
+    procs = [ctx.Process(target=_worker, args=(str(tmp_path / "cache"), log, barrier, results)) for _ in range(n)]
+    for p in procs: p.start()
+    out = [results.get(timeout=60) for _ in procs]
+    for p in procs: p.join(timeout=60)
+
+    with open(log) as fh:
+        calls = fh.read().split()
+    assert len(calls) == 1
+    assert {value for value, _ in out} == {int(calls[0])}
+    assert sum(s["misses"] for _, s in out) == 1
+    assert sum(s["coalesced"] + s["hits"] for _, s in out) == n - 1
+
+def test_expired_entries_are_pruned(tmp_path):
+    cache = SharedCache(str(tmp_path), ttl=60)
+    cache.get_or_compute("old", lambda: 1)
+    cache.get_or_compute("new", lambda: 2)
+    old = cache._path("old")
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    assert cache.prune() == 1
+    assert not os.path.exists(old) and os.path.exists(cache._path("new"))
+    assert cache.get_or_compute("old", lambda: 3) == 3
+
+def test_lock_files_are_reused(tmp_path):
+    cache = SharedCache(str(tmp_path))
+    for i in range(1000): cache.get_or_compute(f"key{i}", lambda: i)
+    assert len(os.listdir(tmp_path / "locks")) <= 256
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".lock")]
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from config import CURRENT_YEAR
+from data_engine import compute_seasonality, compute_significance, derive_roc_frame
+from plot_engine import make_bar_chart
+from providers import SyntheticProvider
+
+def test_empty_pivot_gives_nan_bands():
+    # Start year = current year: no completed years, so the historical pivot is empty
+    close = SyntheticProvider(years=3).history("AAA", None, "1d")["Close"]
+    data = compute_seasonality(derive_roc_frame(close, CURRENT_YEAR, "Monthly"), "Monthly", CURRENT_YEAR)
+    assert data["pivot"].empty
+    sig = compute_significance(data, n_resamples=200)
+
+    for key in ("5", "10", "max"):
+        for name in (f"avg_{key}_lo", f"avg_{key}_hi", f"wr_{key}_lo", f"wr_{key}_hi", f"p_avg_{key}", f"p_wr_{key}"):
+            assert list(sig[name].index) == list(data["periods"]) and sig[name].isna().all()
+    for window in ("5", "10", "max"):
+        make_bar_chart(data, window, True, "Monthly", "AAA", sig)
+
+def test_bands_cover_the_average():
+    rng = np.random.default_rng(0)
+    pivot = pd.DataFrame(rng.normal(1, 2, (20, 12)), index=pd.Index(range(2000, 2020), name="year"), columns=range(1, 13))
+    sig = compute_significance({"pivot": pivot, "periods": list(range(1, 13))}, n_resamples=500)
+    avg = pivot.mean()
+    assert ((sig["avg_max_lo"] <= avg) & (avg <= sig["avg_max_hi"])).all()
+    assert sig["p_avg_5"].between(0, 1).all()